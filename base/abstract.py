@@ -77,6 +77,8 @@ def YAHOO_URL(method: Literal["GET","POST","API"], uri: str, query=str(), **para
     if method == GET:
         if uri == "main": f"https://finance.yahoo.com/quote/{query}/profile" # symbol
     elif method == API:
-        if uri == "query": return "https://query2.finance.yahoo.com/v7/finance/quote"
+        if uri == "cookie": return "https://fc.yahoo.com"
+        elif uri == "crumb": return "https://query1.finance.yahoo.com/v1/test/getcrumb"
+        elif uri == "query": return "https://query2.finance.yahoo.com/v7/finance/quote"
         elif uri == "summary": return f"https://query1.finance.yahoo.com/v10/finance/quoteSummary/{query}" # symbol
     else: return str()
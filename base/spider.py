@@ -1,6 +1,6 @@
 from __future__ import annotations
 from gscraper.base.spider import Spider, AsyncSpider, EncryptedSpider, EncryptedAsyncSpider
-from gscraper.base.types import Keyword, DateFormat, Data, TabularData
+from gscraper.base.types import Keyword, DateFormat, Records, Data, TabularData
 
 from gscraper.utils.cast import cast_date
 from gscraper.utils.map import convert_data
@@ -8,12 +8,15 @@ from gscraper.utils.map import convert_data
 from base.abstract import GET, POST, OPTIONS, HEAD, PUT, PATCH, DELETE, API, URL
 from base.abstract import ALPHA, NAVER, SQUARE, YAHOO
 
-from typing import List, Literal, Optional, Sequence, Union
+from typing import Dict, List, Literal, Optional, Sequence, Tuple, Type, Union
 from numbers import Real
 from abc import ABCMeta
+from dateutil.tz import tzlocal
 import functools
 import datetime as dt
+import numpy as np
 import pandas as pd
+import threading
 
 from holidays.countries import united_states
 from workalendar.usa import UnitedStates
@@ -24,6 +27,7 @@ from workalendar.asia import SouthKorea
 
 EST = "US/Eastern"
 KST = "Asia/Seoul"
+HKT = "Asia/Hong_Kong"
 
 Code = Union[str, Sequence[str]]
 Symbol = Union[str, Sequence[str]]
@@ -44,34 +48,225 @@ def assure_date(func):
     return wrapper
 
 
+EPOCH = dt.date(1970, 1, 1).toordinal()
+
+def _to_days(__date: dt.date) -> int:
+    return __date.toordinal() - EPOCH
+
+def _from_days(__days: int) -> dt.date:
+    return dt.date.fromordinal(int(__days) + EPOCH)
+
+
+class TradingCalendar(object):
+    __slots__ = ("calendar", "holidays", "weekmask", "years", "span", "index", "lock")
+
+    def __init__(self, calendar: Type, holidays: Type):
+        self.calendar, self.holidays = calendar(), holidays()
+        self.weekmask = [int(__i not in self.calendar.get_weekend_days()) for __i in range(7)]
+        self.years, self.span = dict(), tuple()
+        self.index = (0, np.zeros(0, dtype=bool), np.zeros(0, dtype=np.int64), np.busdaycalendar(self.weekmask))
+        self.lock = threading.Lock()
+
+    def _init_year(self, year: int) -> np.ndarray:
+        start, end = dt.date(year, 1, 1), dt.date(year+1, 1, 1)
+        dates = [start + dt.timedelta(days=__i) for __i in range((end-start).days)]
+        return np.array([self.calendar.is_working_day(__date) & (__date not in self.holidays) for __date in dates], dtype=bool)
+
+    def extend(self, startYear: int, endYear: Optional[int]=None):
+        endYear = endYear if isinstance(endYear, int) else startYear
+        if self.span and (self.span[0] <= startYear) and (endYear <= self.span[1]): return
+        with self.lock:
+            if self.span:
+                startYear, endYear = min(startYear, self.span[0]), max(endYear, self.span[1])
+            for year in range(startYear, endYear+1):
+                if year not in self.years:
+                    self.years[year] = self._init_year(year)
+            bitmap = np.concatenate([self.years[year] for year in range(startYear, endYear+1)])
+            origin = _to_days(dt.date(startYear, 1, 1))
+            days = np.arange(len(bitmap), dtype=np.int64) + origin
+            weekday = (days + 3) % 7
+            holidays = days[(~bitmap) & np.isin(weekday, np.flatnonzero(self.weekmask))].astype("datetime64[D]")
+            self.index = (origin, bitmap, days[bitmap], np.busdaycalendar(self.weekmask, holidays=holidays))
+            self.span = (startYear, endYear)
+
+    def extend_days(self, __days: Union[int,np.ndarray], margin=1):
+        __days = np.asarray(__days, dtype="datetime64[D]")
+        __days = __days[~np.isnat(__days)].astype(np.int64)
+        if __days.size:
+            self.extend(_from_days(__days.min()).year-margin, _from_days(__days.max()).year+margin)
+
+    def is_working_day(self, __date: dt.date) -> bool:
+        __days = _to_days(__date)
+        self.extend_days(__days)
+        origin, bitmap = self.index[:2]
+        return bool(bitmap[__days - origin])
+
+    def get_busday(self, __date: dt.date, how: Literal["previous","next"]="previous") -> dt.date:
+        __days = _to_days(__date)
+        self.extend_days(__days)
+        busdays = self.index[2]
+        if how == "previous": return _from_days(busdays[np.searchsorted(busdays, __days, side="right")-1])
+        elif how == "next": return _from_days(busdays[np.searchsorted(busdays, __days, side="left")])
+        else: raise ValueError(f"Invalid progress method entered: '{how}'")
+
+    def busdaycalendar(self, __days: np.ndarray, margin=1) -> np.busdaycalendar:
+        self.extend_days(__days, margin)
+        return self.index[3]
+
+
+US_CALENDAR = TradingCalendar(UnitedStates, united_states.US)
+KR_CALENDAR = TradingCalendar(SouthKorea, south_korea.KR)
+
+
+def get_calendar(tzinfo=EST) -> TradingCalendar:
+    if (tzinfo is None) or (str(tzinfo) == EST): return US_CALENDAR
+    elif str(tzinfo) == KST: return KR_CALENDAR
+    else: raise ValueError(f"Invalid timezone entered: '{tzinfo}'")
+
+
 @assure_date
 def is_us_working_day(__date: DateFormat) -> bool:
-    calendar, holidays = UnitedStates(), united_states.US()
-    return calendar.is_working_day(__date) & (__date not in holidays)
+    return US_CALENDAR.is_working_day(__date)
 
 
 @assure_date
 def is_kr_working_day(__date: DateFormat) -> bool:
-    calendar, holidays = SouthKorea(), south_korea.KR()
-    return calendar.is_working_day(__date) & (__date not in holidays)
+    return KR_CALENDAR.is_working_day(__date)
 
 
 @assure_date
 def is_working_day(__date: DateFormat, tzinfo="US/Eastern") -> bool:
-    if not isinstance(__date, dt.date): raise TypeError("Date type input is required.")
-    if str(tzinfo) == EST: return is_us_working_day(__date)
-    elif str(tzinfo) == KST: return is_kr_working_day(__date)
-    elif tzinfo is None: return is_us_working_day(__date)
-    else: raise ValueError(f"Invalid timezone entered: '{tzinfo}'")
+    return get_calendar(tzinfo).is_working_day(__date)
 
 
 @assure_date
 def get_busday(__date: DateFormat, tzinfo="US/Eastern", how: Literal["previous","next"]="previous") -> dt.date:
-    while not is_working_day(__date, tzinfo):
-        if how == "previous": __date = __date - dt.timedelta(days=1)
-        elif how == "next": __date = __date + dt.timedelta(days=1)
-        else: raise ValueError(f"Invalid progress method entered: '{tzinfo}'")
-    return __date
+    return get_calendar(tzinfo).get_busday(__date, how)
+
+
+BUSDAY_ROLL = {"previous":"backward", "next":"forward"}
+
+def _to_datetime64(__dates: Union[DateFormat,Sequence[DateFormat]]) -> Tuple[np.ndarray,bool]:
+    is_scalar = isinstance(__dates, (str, dt.date, np.datetime64))
+    __dates = pd.DatetimeIndex(pd.to_datetime([__dates] if is_scalar else __dates))
+    if __dates.tz is not None: __dates = __dates.tz_localize(None)
+    return __dates.values.astype("datetime64[D]"), is_scalar
+
+
+def _from_datetime64(__dates: np.ndarray, is_scalar=False) -> Union[dt.date,np.ndarray]:
+    return (__dates[0].astype(dt.date) if is_scalar else __dates)
+
+
+def busday_roll(__dates: Union[DateFormat,Sequence[DateFormat]], tzinfo="US/Eastern",
+                how: Literal["previous","next"]="previous") -> Union[dt.date,np.ndarray]:
+    return busday_offset(__dates, 0, tzinfo=tzinfo, roll=how)
+
+
+def busday_offset(__dates: Union[DateFormat,Sequence[DateFormat]], offsets: Union[int,Sequence[int]]=0,
+                tzinfo="US/Eastern", roll: Literal["previous","next"]="previous") -> Union[dt.date,np.ndarray]:
+    if roll not in BUSDAY_ROLL: raise ValueError(f"Invalid progress method entered: '{roll}'")
+    __dates, is_scalar = _to_datetime64(__dates)
+    offsets = np.asarray(offsets, dtype=np.int64)
+    margin = (int(np.abs(offsets).max()) // 200 + 1) if offsets.size else 1
+    busdaycal = get_calendar(tzinfo).busdaycalendar(__dates, margin=margin)
+    __dates = np.busday_offset(__dates, offsets, roll=BUSDAY_ROLL[roll], busdaycal=busdaycal)
+    return _from_datetime64(__dates, is_scalar and (offsets.ndim == 0))
+
+
+def busday_count(startDates: Union[DateFormat,Sequence[DateFormat]], endDates: Union[DateFormat,Sequence[DateFormat]],
+                tzinfo="US/Eastern") -> Union[int,np.ndarray]:
+    (startDates, is_scalar), (endDates, _) = _to_datetime64(startDates), _to_datetime64(endDates)
+    busdaycal = get_calendar(tzinfo).busdaycalendar(np.concatenate([startDates, endDates]))
+    count = np.busday_count(startDates, endDates, busdaycal=busdaycal)
+    return int(count[0]) if is_scalar and (count.size == 1) else count
+
+
+def busday_range(startDate: DateFormat, endDate: DateFormat, tzinfo="US/Eastern") -> np.ndarray:
+    (startDate, endDate), _ = _to_datetime64([startDate, endDate])
+    busdaycal = get_calendar(tzinfo).busdaycalendar(np.array([startDate, endDate]))
+    dates = np.arange(startDate, endDate+1, dtype="datetime64[D]")
+    return dates[np.is_busday(dates, busdaycal=busdaycal)]
+
+
+###################################################################
+########################### Price Frame ###########################
+###################################################################
+
+def _to_column(__s: pd.Series) -> Union[np.ndarray,pd.api.extensions.ExtensionArray]:
+    return __s.array if isinstance(__s.dtype, pd.api.extensions.ExtensionDtype) else __s.to_numpy()
+
+
+class PriceFrame(object):
+    __slots__ = ("columns", "index", "groups", "rows")
+
+    def __init__(self, columns: Dict[str,np.ndarray]=dict(), index: Optional[pd.Index]=None,
+                groups: Optional[Tuple[str,np.ndarray]]=None, rows: Optional[np.ndarray]=None):
+        self.columns, self.index, self.groups, self.rows = dict(columns), index, groups, rows
+
+    @classmethod
+    def from_data(cls, data: Union[PriceFrame,TabularData]) -> PriceFrame:
+        if isinstance(data, PriceFrame): return data
+        data = convert_data(data, return_type="dataframe")
+        return cls({__column: _to_column(data[__column]) for __column in data.columns}, data.index)
+
+    def __len__(self) -> int:
+        return len(self.index) if self.index is not None else len(next(iter(self.columns.values()), list()))
+
+    def __contains__(self, __column: str) -> bool:
+        return __column in self.columns
+
+    def __getitem__(self, __column: str) -> np.ndarray:
+        return self.columns[__column]
+
+    def __setitem__(self, __column: str, __values: np.ndarray):
+        self.columns[__column] = __values
+
+    def keys(self) -> List[str]:
+        return list(self.columns.keys())
+
+    def copy(self) -> PriceFrame:
+        return PriceFrame(self.columns, self.index, self.groups, self.rows)
+
+    def take(self, __indices: np.ndarray) -> PriceFrame:
+        index = self.index.take(__indices) if self.index is not None else None
+        rows = self.rows.take(__indices) if self.rows is not None else __indices
+        return PriceFrame({__column: __values.take(__indices) for __column, __values in self.columns.items()}, index, rows=rows)
+
+    def reset_index(self) -> PriceFrame:
+        return PriceFrame(self.columns, None, self.groups, self.rows)
+
+    def to_dataframe(self) -> pd.DataFrame:
+        return pd.DataFrame(self.columns, index=(self.index if self.index is not None else pd.RangeIndex(len(self))))
+
+    def to_records(self) -> Records:
+        return convert_data(self.to_dataframe(), return_type="records")
+
+    def update_dataframe(self, data: pd.DataFrame, source: Dict[str,np.ndarray]=dict()) -> pd.DataFrame:
+        if self.rows is not None:
+            inverse = np.empty(len(self.rows), dtype=np.int64)
+            inverse[self.rows] = np.arange(len(self.rows))
+        for __column, __values in self.columns.items():
+            if __values is source.get(__column): continue
+            data[__column] = __values.take(inverse) if self.rows is not None else __values
+        return data
+
+
+def _to_origin(frame: Union[PriceFrame,List[PriceFrame]], data: TabularData, source: PriceFrame,
+                inplace=False) -> Union[TabularData,List[TabularData]]:
+    if isinstance(frame, PriceFrame):
+        if inplace and isinstance(data, pd.DataFrame): return frame.update_dataframe(data, source.columns)
+        return frame.to_dataframe() if isinstance(data, pd.DataFrame) else frame.to_records()
+    elif isinstance(data, pd.DataFrame): return [__frame.to_dataframe() for __frame in frame]
+    else: return [__frame.to_records() for __frame in frame]
+
+
+def assure_price_frame(func):
+    @functools.wraps(func)
+    def wrapper(data: Union[PriceFrame,TabularData], *args, inplace=False, **kwargs):
+        if isinstance(data, PriceFrame): return func(data, *args, **kwargs)
+        source = PriceFrame.from_data(data)
+        return _to_origin(func(source, *args, **kwargs), data, source, inplace)
+    return wrapper
 
 
 ###################################################################
@@ -86,10 +281,6 @@ def change(__from: float, __to: float) -> float:
     return (__to - __from) / __from
 
 
-def _round(x: float, trunc: Optional[int]=2) -> float:
-    return round(x, trunc) if isinstance(trunc, int) and isinstance(x, float) and pd.notna(x) else x
-
-
 def assure_dataframe(func):
     @functools.wraps(func)
     def wrapper(data: TabularData, *args, **kwargs):
@@ -100,61 +291,407 @@ def assure_dataframe(func):
     return wrapper
 
 
-@assure_dataframe
-def groupby_symbols(data: pd.DataFrame, column="symbol") -> List[pd.DataFrame]:
-    if column not in data: return [data]
+def _get_panel_keys(data: PriceFrame, column="symbol") -> List[str]:
     has_date, has_datetime = ("date" in data), ("datetime" in data)
-    keys = [column]+(["datetime"] if has_datetime else (["date"] if has_date else list()))
-    data = data.sort_values(keys)
-    return [data[data[column]==symbol] for symbol in data[column].unique()]
+    return [column]+(["datetime"] if has_datetime else (["date"] if has_date else list()))
+
+
+def _factorize(__values: np.ndarray, sort=True) -> np.ndarray:
+    return pd.factorize(__values, sort=sort)[0]
+
+
+def _is_sorted_panel(groups: np.ndarray, values: Optional[np.ndarray]=None) -> bool:
+    if not np.all(groups[1:] >= groups[:-1]): return False
+    elif values is None: return True
+    values = np.asarray(values)
+    try: return bool(np.all((groups[1:] != groups[:-1]) | (values[1:] >= values[:-1])))
+    except TypeError: return False
+
+
+def _sort_panel(data: PriceFrame, groupby: Optional[str]=None) -> Tuple[PriceFrame,Optional[np.ndarray]]:
+    if not (groupby and (groupby in data)): return data.copy(), None
+    elif data.groups and (data.groups[0] == groupby): return data.copy(), data.groups[1]
+    keys, groups = _get_panel_keys(data, groupby), _factorize(data[groupby])
+    if not _is_sorted_panel(groups, (data[keys[1]] if len(keys) > 1 else None)):
+        order = groups.astype(np.int64)
+        if len(keys) > 1:
+            codes = _factorize(data[keys[1]])
+            order = order * (codes.max()+1) + codes
+        order = np.argsort(order, kind="stable")
+        data, groups = data.take(order), groups.take(order)
+    data = data.copy()
+    data.groups = (groupby, groups)
+    return data, groups
+
+
+def _group_starts(groups: Optional[np.ndarray], size: int) -> np.ndarray:
+    starts = np.zeros(size, dtype=bool)
+    if size: starts[0] = True
+    if (groups is not None) and (size > 1):
+        starts[1:] = groups[1:] != groups[:-1]
+    return starts
+
+
+@assure_price_frame
+def groupby_symbols(data: PriceFrame, column="symbol") -> List[PriceFrame]:
+    if column not in data: return [data]
+    data, groups = _sort_panel(data, column)
+    bounds = np.append(np.flatnonzero(_group_starts(groups, len(data))), len(data))
+    return [data.take(np.arange(__start, __end)) for __start, __end in zip(bounds[:-1], bounds[1:])
+            if groups[__start] >= 0]
 
 
-@assure_dataframe
-def set_change(data: pd.DataFrame, trunc: Optional[int]=4) -> pd.DataFrame:
+@assure_price_frame
+def set_change(data: PriceFrame, trunc: Optional[int]=4, groupby: Optional[str]=None) -> PriceFrame:
     if "close" not in data:
         return data
     if "previousClose" not in data:
-        data = set_previous_close(data)
+        data = set_previous_close(data, groupby=groupby)
     return _calc_change_by_price(data, trunc=trunc)
 
 
-@assure_dataframe
-def set_previous_close(data: pd.DataFrame) -> pd.DataFrame:
-    data = data.copy()
+def _round_values(values: np.ndarray, trunc: Optional[int]=2) -> np.ndarray:
+    if not isinstance(trunc, int): return values
+    return np.round(values, trunc)
+
+
+def _to_float(values: np.ndarray) -> np.ndarray:
+    if isinstance(values, np.ndarray) and (values.dtype.kind in "fiub"): return values.astype(float, copy=False)
+    else: return pd.Series(values).to_numpy(dtype=float, na_value=np.nan)
+
+
+def _to_day_keys(__dates: np.ndarray) -> np.ndarray:
+    __dates = pd.DatetimeIndex(pd.to_datetime(__dates))
+    if __dates.tz is not None:
+        __dates = __dates.tz_localize(None)
+    return __dates.values.astype("datetime64[D]").astype(np.int64)
+
+
+def _to_time_keys(__datetimes: np.ndarray) -> np.ndarray:
+    __datetimes = pd.DatetimeIndex(pd.to_datetime(__datetimes))
+    if __datetimes.tz is not None:
+        __datetimes = __datetimes.tz_convert("UTC").tz_localize(None)
+    return __datetimes.values.astype("datetime64[ns]").astype(np.int64)
+
+
+def _to_panel_keys(keys: np.ndarray, notna: np.ndarray, groups: Optional[np.ndarray]=None) -> Tuple[np.ndarray,int]:
+    if (groups is None) or (not notna.any()): return keys, 0
+    keys, span = (keys - keys[notna].min()), (keys[notna].max() - keys[notna].min() + 1)
+    return np.where(notna & (groups >= 0), groups * span + keys, -1), span
+
+
+def _previous_daily_close(keys: np.ndarray, close: np.ndarray, valid: np.ndarray, span=0) -> np.ndarray:
+    dates = np.unique(keys[valid])
+    closed = valid & ~np.isnan(close)
+    order = np.argsort(keys[closed], kind="stable")[::-1]
+    closedDates, last = np.unique(keys[closed][order], return_index=True)
+    dailyClose = np.full(len(dates), np.nan)
+    dailyClose[np.searchsorted(dates, closedDates)] = close[closed][order][last]
+    __index = np.searchsorted(dates, keys)
+    matched = (__index > 0) & (__index < len(dates))
+    matched[matched] = dates[__index[matched]] == keys[matched]
+    if span:
+        matched[matched] = (dates[__index[matched]-1] // span) == (keys[matched] // span)
+    previousClose = np.full(len(keys), np.nan)
+    previousClose[matched] = dailyClose[__index[matched]-1]
+    return previousClose
+
+
+def _shift_values(values: np.ndarray, groups: Optional[np.ndarray]=None) -> np.ndarray:
+    shifted = np.full(len(values), np.nan)
+    shifted[1:] = values[:-1]
+    shifted[_group_starts(groups, len(values))] = np.nan
+    return shifted
+
+
+@assure_price_frame
+def set_previous_close(data: PriceFrame, groupby: Optional[str]=None) -> PriceFrame:
+    data, groups = _sort_panel(data, groupby)
     if "datetime" in data:
         if "date" not in data:
-            data["date"] = data["datetime"].apply(lambda x: x.date())
-        daily = (data[data["volume"]>0].groupby("date").agg({"close":"last"}).
-                reset_index().rename(columns={"close":"previousClose"}))
-        daily["date"] = daily["date"].shift(-1)
-        return data.merge(daily[daily["date"].notna()], how="left", on="date")
-    data["previousClose"] = data["close"].shift(1)
+            data["date"] = pd.DatetimeIndex(data["datetime"]).normalize().date
+        notna = pd.notna(data["date"])
+        keys, span = _to_panel_keys(_to_day_keys(data["date"]), notna, groups)
+        valid = (_to_float(data["volume"]) > 0) & notna & ((groups >= 0) if groups is not None else True)
+        data = data.reset_index()
+        data["previousClose"] = _previous_daily_close(keys, _to_float(data["close"]), valid, span)
+        return data
+    data["previousClose"] = _shift_values(_to_float(data["close"]), groups)
     return data
 
 
-@assure_dataframe
-def _calc_change_by_price(data: pd.DataFrame, trunc: Optional[int]=4) -> pd.DataFrame:
+@assure_price_frame
+def _calc_change_by_price(data: PriceFrame, trunc: Optional[int]=4) -> PriceFrame:
     data = data.copy()
+    previousClose = _to_float(data["previousClose"])
     for column, price in zip(PRICE_CHANGES, PRICE_COLUMNS):
         if (price == "open") and ("datetime" in data): continue
         elif price in data:
-            data[column] = ((data[price] - data["previousClose"]) / data["previousClose"]).apply(lambda x: _round(x, trunc))
+            data[column] = _round_values((_to_float(data[price]) - previousClose) / previousClose, trunc)
     return data
 
 
-@assure_dataframe
-def set_draw_down(data: pd.DataFrame, maxPrice: Optional[Real]=None, trunc: Optional[int]=4) -> pd.DataFrame:
+def _cummax(values: np.ndarray, groups: Optional[np.ndarray]=None) -> np.ndarray:
+    if groups is not None:
+        return pd.Series(values).groupby(groups, sort=False).cummax().to_numpy(dtype=float)
+    cummax = np.fmax.accumulate(values) if len(values) else values
+    return np.where(np.isnan(values), np.nan, cummax)
+
+
+def _get_max_price(data: PriceFrame, maxPrice: Optional[Union[Real,Dict[str,Real]]]=None,
+                    groupby: Optional[str]=None) -> Union[float,np.ndarray]:
+    if isinstance(maxPrice, Dict) and groupby and (groupby in data):
+        return _to_float(pd.Series(data[groupby]).map(maxPrice))
+    else: return float(maxPrice) if isinstance(maxPrice, (float,int)) else np.nan
+
+
+@assure_price_frame
+def set_draw_down(data: PriceFrame, maxPrice: Optional[Union[Real,Dict[str,Real]]]=None, trunc: Optional[int]=4,
+                groupby: Optional[str]=None) -> PriceFrame:
     if ("high" not in data) or ("close" not in data): return data
-    elif isinstance(maxPrice, (float,int)):
-        data = pd.concat([pd.DataFrame([{"high":maxPrice}], columns=data.columns), data])
-    else: data = data.copy()
-    data["maxPrice"] = data["high"].cummax()
-    if isinstance(maxPrice, (float,int)):
-        data = data.iloc[1:].copy()
-    data["drawDown"] = ((data["close"] - data["maxPrice"]) / data["maxPrice"]).apply(lambda x: _round(x, trunc))
+    data, groups = _sort_panel(data, groupby)
+    cummax, seed = _cummax(_to_float(data["high"]), groups), _get_max_price(data, maxPrice, groupby)
+    data["maxPrice"] = np.where(np.isnan(seed), cummax, np.maximum(cummax, seed))
+    data["drawDown"] = _round_values((_to_float(data["close"]) - data["maxPrice"]) / data["maxPrice"], trunc)
     return data
 
 
+###################################################################
+########################## Join Function ##########################
+###################################################################
+
+JoinFrame = Union[pd.DataFrame, Tuple[pd.DataFrame,Dict[str,str]]]
+
+
+def _take_aligned(__values: np.ndarray, position: np.ndarray, missing: np.ndarray) -> np.ndarray:
+    if not len(__values): return np.full(len(position), np.nan)
+    elif not missing.any(): return __values[position]
+    if __values.dtype.kind in "iu": __values = __values.astype(float)
+    elif __values.dtype.kind not in "fcmM": __values = __values.astype(object)
+    values = __values[position]
+    values[missing] = np.datetime64("NaT") if __values.dtype.kind in "mM" else np.nan
+    return values
+
+
+def _align_frame(frame: JoinFrame, index: pd.Index, on="date") -> Dict[str,np.ndarray]:
+    frame, rename = frame if isinstance(frame, tuple) else (frame, dict())
+    columns = [__column for __column in (rename if rename else frame.columns) if (__column != on) and (__column in frame)]
+    keys = pd.Index(frame[on])
+    unique = np.asarray(~keys.duplicated(keep="last"))
+    indexer = keys[unique].get_indexer(index)
+    missing = indexer < 0
+    position = np.flatnonzero(unique)[np.where(missing, 0, indexer)] if len(keys) else indexer
+    return {rename.get(__column, __column): _take_aligned(frame[__column].to_numpy(), position, missing)
+            for __column in columns}
+
+
+def join_aligned(data: pd.DataFrame, *others: JoinFrame, on="date") -> pd.DataFrame:
+    if not others: return data
+    index, columns = pd.Index(data[on]), dict()
+    for __frame in others: columns.update(_align_frame(__frame, index, on))
+    return pd.concat([data.reset_index(drop=True), pd.DataFrame(columns)], axis=1)
+
+
+AsofFrame = Tuple[pd.DataFrame, Dict[str,str], str]
+
+SESSION_HOURS = {EST: (dt.time(9,30), dt.time(16)), KST: (dt.time(9), dt.time(15,30)), HKT: (dt.time(9,30), dt.time(16))}
+
+
+def to_session_time(__dates: pd.Series, tzinfo=EST, how: Literal["open","close"]="close") -> np.ndarray:
+    time = SESSION_HOURS[tzinfo][0 if how == "open" else 1]
+    offset = pd.Timedelta(hours=time.hour, minutes=time.minute)
+    datetime = (pd.to_datetime(pd.Series(__dates).reset_index(drop=True)) + offset).dt.tz_localize(tzinfo)
+    return datetime.dt.tz_convert("UTC").dt.tz_localize(None).to_numpy(dtype="datetime64[ns]")
+
+
+def _asof_frame(frame: AsofFrame, times: np.ndarray, tolerance: np.timedelta64, on="date") -> Dict[str,np.ndarray]:
+    frame, rename, tzinfo = frame
+    columns = [__column for __column in rename if __column in frame]
+    if not len(frame): return {rename[__column]: np.full(len(times), np.nan) for __column in columns}
+    keys = to_session_time(frame[on], tzinfo, how="close")
+    order = np.argsort(keys, kind="stable")
+    last = np.r_[keys[order][1:] != keys[order][:-1], True]
+    keys, order = keys[order][last], order[last]
+    indexer = np.searchsorted(keys, times, side="right") - 1
+    missing = (indexer < 0) | np.isnat(times)
+    position = np.where(missing, 0, indexer)
+    missing |= (times - keys[position]) > tolerance
+    position = order[position]
+    return {rename[__column]: _take_aligned(frame[__column].to_numpy(), position, missing) for __column in columns}
+
+
+def join_asof(data: pd.DataFrame, *others: AsofFrame, on="date", tzinfo=KST, how: Literal["open","close"]="open",
+                tolerance: dt.timedelta=dt.timedelta(days=5)) -> pd.DataFrame:
+    if not others: return data
+    times, tolerance, columns = to_session_time(data[on], tzinfo, how), np.timedelta64(tolerance), dict()
+    for __frame in others: columns.update(_asof_frame(__frame, times, tolerance, on))
+    return pd.concat([data.reset_index(drop=True), pd.DataFrame(columns)], axis=1)
+
+
+###################################################################
+########################## Price Engine ###########################
+###################################################################
+
+PRICE_STATE = ["key", "date", "close", "sessionClose", "hasVolume", "previousClose", "maxPrice"]
+
+
+class PriceState(object):
+    __slots__ = PRICE_STATE + ["prior"]
+
+    def __init__(self, key: Optional[int]=None, date: Optional[int]=None, close=np.nan, sessionClose=np.nan,
+                hasVolume=False, previousClose=np.nan, maxPrice=np.nan, prior: Optional[Dict]=None):
+        self.key, self.date, self.close, self.sessionClose = key, date, close, sessionClose
+        self.hasVolume, self.previousClose, self.maxPrice = hasVolume, previousClose, maxPrice
+        self.prior = prior
+
+    def to_dict(self) -> Dict:
+        return dict({__key: getattr(self, __key) for __key in PRICE_STATE}, prior=self.prior)
+
+    def restore(self):
+        if self.prior is not None:
+            for __key, __value in self.prior.items():
+                setattr(self, __key, __value)
+
+    def update_daily(self, key: int, close: float) -> float:
+        previousClose = self.close
+        self.key, self.date, self.close = key, key, close
+        return previousClose
+
+    def update_intraday(self, key: int, date: int, close: float, volume: float) -> float:
+        if date != self.date:
+            if self.hasVolume: self.previousClose = self.sessionClose
+            self.date, self.sessionClose, self.hasVolume = date, np.nan, False
+        if volume > 0:
+            self.hasVolume = True
+            if not np.isnan(close): self.sessionClose = close
+        self.key = key
+        return self.previousClose
+
+    def update_max_price(self, high: float) -> float:
+        if np.isnan(high): return np.nan
+        self.maxPrice = high if np.isnan(self.maxPrice) else max(self.maxPrice, high)
+        return self.maxPrice
+
+
+class PriceEngine(object):
+    __slots__ = ("states", "groupby", "maxPrice", "trunc")
+
+    def __init__(self, groupby: Optional[str]="symbol", maxPrice: Optional[Union[Real,Dict[str,Real]]]=None,
+                trunc: Optional[int]=4, states: Dict[str,PriceState]=dict()):
+        self.states, self.groupby, self.maxPrice, self.trunc = dict(states), groupby, maxPrice, trunc
+
+    def get_state(self, __key: Optional[str]=None) -> PriceState:
+        if __key not in self.states:
+            maxPrice = self.maxPrice.get(__key) if isinstance(self.maxPrice, Dict) else self.maxPrice
+            self.states[__key] = PriceState(maxPrice=(float(maxPrice) if isinstance(maxPrice, (float,int)) else np.nan))
+        return self.states[__key]
+
+    def update(self, data: Union[PriceFrame,TabularData], inplace=False) -> Union[PriceFrame,TabularData]:
+        if isinstance(data, PriceFrame): return self._update_frame(data)
+        source = PriceFrame.from_data(data)
+        return _to_origin(self._update_frame(source), data, source, inplace)
+
+    def _update_frame(self, data: PriceFrame) -> PriceFrame:
+        if "close" not in data: return data
+        data, size, is_intraday = data.copy(), len(data), ("datetime" in data)
+        symbols = data[self.groupby].tolist() if self.groupby and (self.groupby in data) else [None]*size
+        keys = _to_time_keys(data["datetime"] if is_intraday else data["date"]).tolist()
+        dates = _to_day_keys(data["date"] if "date" in data else data["datetime"]).tolist() if is_intraday else keys
+        close, high = _to_float(data["close"]), (_to_float(data["high"]) if "high" in data else np.full(size, np.nan))
+        volume = _to_float(data["volume"]) if "volume" in data else np.ones(size)
+        previousClose, maxPrice = np.full(size, np.nan), np.full(size, np.nan)
+        for __i, (__symbol, __key, __date) in enumerate(zip(symbols, keys, dates)):
+            state = self.get_state(__symbol)
+            if (state.key is not None) and (__key < state.key): continue
+            elif __key == state.key: state.restore()
+            state.prior = {__state: getattr(state, __state) for __state in PRICE_STATE}
+            if is_intraday: previousClose[__i] = state.update_intraday(__key, __date, close[__i], volume[__i])
+            else: previousClose[__i] = state.update_daily(__key, close[__i])
+            maxPrice[__i] = state.update_max_price(high[__i])
+        data["previousClose"] = previousClose
+        data = _calc_change_by_price(data, trunc=self.trunc)
+        if "high" in data:
+            data["maxPrice"] = maxPrice
+            data["drawDown"] = _round_values((close - maxPrice) / maxPrice, self.trunc)
+        return data
+
+    def to_records(self) -> Records:
+        return [dict(state.to_dict(), symbol=__key) for __key, state in self.states.items()]
+
+    @classmethod
+    def from_records(cls, records: Records, groupby: Optional[str]="symbol", maxPrice: Optional[Real]=None,
+                    trunc: Optional[int]=4) -> PriceEngine:
+        notnull = lambda __key, __value: __value if (__value is not None) or (__key in ("key","date","prior")) else np.nan
+        states = {__m["symbol"]: PriceState(**{__key: notnull(__key, __m.get(__key)) for __key in PRICE_STATE+["prior"]})
+                    for __m in records}
+        return cls(groupby, maxPrice, trunc, states)
+
+
+###################################################################
+######################### Resample Function #######################
+###################################################################
+
+OHLCV_AGG = {"open":"first", "high":"max", "low":"min", "close":"last", "volume":"sum"}
+
+
+def _to_session_bars(__datetimes: pd.Series, freq: Union[str,int]="day",
+                    tzinfo=KST) -> Tuple[pd.Series,pd.Series,pd.Series,np.ndarray]:
+    times = pd.to_datetime(pd.Series(__datetimes).reset_index(drop=True))
+    times = (times.dt.tz_localize(tzlocal()) if times.dt.tz is None else times).dt.tz_convert(tzinfo)
+    days = times.dt.normalize()
+    open, close = (pd.Timedelta(hours=__time.hour, minutes=__time.minute) for __time in SESSION_HOURS[tzinfo])
+    elapsed = (times - days) - open
+    valid = np.asarray(times.notna() & (elapsed >= pd.Timedelta(0)) & (elapsed <= (close - open)))
+    if freq == "day": return times, days, days + open, valid
+    width = pd.Timedelta(minutes=freq)
+    buckets = np.minimum(elapsed // width, (close - open - pd.Timedelta(1)) // width)
+    bars = days + open + buckets * width
+    return times, bars, bars, valid
+
+
+def _drop_partial_bars(groups: np.ndarray, times: np.ndarray, bars: np.ndarray, starts: np.ndarray) -> np.ndarray:
+    first = _group_starts(groups, len(groups))
+    index = np.cumsum(first) - 1
+    leading, partial = bars[first], (times[first] > starts[first])
+    return ~(partial[index] & (bars == leading[index]))
+
+
+def resample_ohlcv(data: pd.DataFrame, freq: Union[str,int]="day", tzinfo=KST, on="datetime",
+                    groupby: Optional[str]="code", partial=False) -> pd.DataFrame:
+    if not len(data): return data.reset_index(drop=True)
+    columns, tz = list(data.columns), pd.to_datetime(data[on]).dt.tz
+    times, bars, starts, valid = _to_session_bars(data[on], freq, tzinfo)
+    data, bars = data.reset_index(drop=True)[valid], bars[valid].rename("__bar")
+    times, starts = (__s[valid].dt.tz_convert(None).to_numpy() for __s in (times, starts))
+    keys = ([groupby] if groupby and (groupby in data) else list())
+    groups = _factorize(data[groupby]) if keys else np.zeros(len(data), dtype=np.int64)
+    order = np.lexsort([times, groups])
+    data, bars = data.take(order), bars.take(order)
+    if not partial:
+        keep = _drop_partial_bars(groups[order], times[order], bars.dt.tz_convert(None).to_numpy(), starts[order])
+        data, bars = data[keep], bars[keep]
+    agg = {__column: OHLCV_AGG.get(__column, "last") for __column in columns if __column not in keys+[on, "date"]}
+    data = data.groupby([data[__key] for __key in keys]+[bars], sort=True).agg(agg).reset_index()
+    bars = data.pop("__bar")
+    data[on] = bars.dt.tz_convert(tz) if tz is not None else bars.dt.tz_convert(tzlocal()).dt.tz_localize(None)
+    data["date"] = bars.dt.date
+    return data[[__column for __column in columns if __column in data]+(["date"] if "date" not in columns else list())]
+
+
+###################################################################
+######################### Pipeline Function #######################
+###################################################################
+
+def prune_dags(dags: Sequence[Dict], fields: Union[Sequence[str],Dict[str,Sequence[str]]]=list(),
+                lineage: Dict[str,Sequence[str]]=dict(), required: Sequence[str]=list()) -> List[Dict]:
+    if not fields: return list(dags)
+    elif isinstance(fields, Dict):
+        return [__task for __task in dags if (__task["dataName"] in fields) or (__task["dataName"] in required)]
+    fields = {fields} if isinstance(fields, str) else set(fields)
+    return [__task for __task in dags if (__task["dataName"] in required) or (__task["dataName"] not in lineage)
+            or (fields & set(lineage[__task["dataName"]]))]
+
+
 ###################################################################
 ########################### Fiannce Base ##########################
 ###################################################################
@@ -0,0 +1,263 @@
+from gscraper.base.types import IndexLabel, DateFormat
+from gscraper.utils.cast import cast_date
+
+from base.spider import EST, busday_range
+
+from typing import Any, Callable, Dict, Hashable, List, Literal, Optional, Tuple
+from concurrent.futures import Future
+import datetime as dt
+import numpy as np
+import os
+import pandas as pd
+import threading
+import time
+
+
+###################################################################
+########################### Table Store ###########################
+###################################################################
+
+TABLE_FORMATS = [".parquet", ".csv", ".pkl", ".pickle"]
+
+get_table_format = lambda path: os.path.splitext(str(path))[1].lower()
+
+
+def read_table(path: str, dateFields: IndexLabel=["date"]) -> pd.DataFrame:
+    if not (path and os.path.exists(path)): return pd.DataFrame()
+    format = get_table_format(path)
+    if format == ".parquet": data = pd.read_parquet(path)
+    elif format == ".csv": data = pd.read_csv(path)
+    elif format in (".pkl", ".pickle"): data = pd.read_pickle(path)
+    else: raise ValueError(f"'{format}' is not a supported table format. Choose one of {TABLE_FORMATS}.")
+    for __field in ([dateFields] if isinstance(dateFields, str) else dateFields):
+        if (__field in data) and len(data):
+            data[__field] = pd.to_datetime(data[__field]).dt.date
+    return data
+
+
+def write_table(data: pd.DataFrame, path: str):
+    format = get_table_format(path)
+    if format not in TABLE_FORMATS:
+        raise ValueError(f"'{format}' is not a supported table format. Choose one of {TABLE_FORMATS}.")
+    if os.path.dirname(path): os.makedirs(os.path.dirname(path), exist_ok=True)
+    temp = f"{path}.tmp"
+    if format == ".parquet": data.to_parquet(temp, index=False)
+    elif format == ".csv": data.to_csv(temp, index=False)
+    else: data.to_pickle(temp)
+    os.replace(temp, path)
+
+
+def append_table(data: pd.DataFrame, path: str, on: str="date", stored: Optional[pd.DataFrame]=None) -> pd.DataFrame:
+    stored = read_table(path, dateFields=on) if stored is None else stored
+    if len(stored):
+        data = pd.concat([stored[~stored[on].isin(data[on])], data], ignore_index=True) if len(data) else stored
+    data = data.sort_values(on).reset_index(drop=True)
+    write_table(data, path)
+    return data
+
+
+def get_table_tail(data: pd.DataFrame, on: str="date") -> Optional[pd.Series]:
+    return data.loc[data[on].idxmax()] if (on in data) and len(data) else None
+
+
+def between_table(data: pd.DataFrame, startDate: Optional[DateFormat]=None, endDate: Optional[DateFormat]=None,
+                    on: str="date") -> pd.DataFrame:
+    if not len(data): return data
+    startDate, endDate = cast_date(startDate, default=dt.date.min), cast_date(endDate, default=dt.date.max)
+    return data[(data[on] >= startDate) & (data[on] <= endDate)].reset_index(drop=True)
+
+
+###################################################################
+############################ Bar Store ############################
+###################################################################
+
+BAR_STORE_LOCK = threading.Lock()
+
+BAR_DATE_COLUMNS = ["symbol", "open", "high", "low", "close", "volume", "date"]
+BAR_TIME_COLUMNS = ["symbol", "open", "high", "low", "close", "volume", "datetime"]
+
+get_month = lambda __date: __date.strftime("%Y-%m")
+
+
+def merge_ranges(ranges: List[Tuple[dt.date,dt.date]]) -> List[Tuple[dt.date,dt.date]]:
+    merged = list()
+    for __start, __end in sorted(ranges):
+        if merged and (__start <= merged[-1][1]): merged[-1] = (merged[-1][0], max(merged[-1][1], __end))
+        else: merged.append((__start, __end))
+    return merged
+
+
+def subtract_ranges(ranges: List[Tuple[dt.date,dt.date]], covered: List[Tuple[dt.date,dt.date]]) -> List[Tuple[dt.date,dt.date]]:
+    missing, covered = list(), merge_ranges(covered)
+    for __start, __end in merge_ranges(ranges):
+        for __left, __right in covered:
+            if (__right <= __start) or (__left >= __end): continue
+            if __left > __start: missing.append((__start, __left))
+            __start = max(__start, __right)
+            if __start >= __end: break
+        if __start < __end: missing.append((__start, __end))
+    return missing
+
+
+class BarStore(object):
+    __slots__ = ("root", "interval", "dateType", "columns", "format")
+
+    def __init__(self, root: str, interval: str="1d", dateType: Literal["date","datetime"]="date",
+                columns: Optional[List[str]]=None, format: str=".parquet"):
+        self.root, self.interval, self.dateType, self.format = root, interval, dateType, format
+        self.columns = list(columns) if columns else (BAR_DATE_COLUMNS if dateType == "date" else BAR_TIME_COLUMNS)
+
+    def get_path(self, symbol: str, month: str) -> str:
+        return os.path.join(self.root, symbol, self.interval, month+self.format)
+
+    def get_empty_path(self, symbol: str) -> str:
+        return os.path.join(self.root, symbol, self.interval, "empty"+self.format)
+
+    def read_empty(self, symbol: str) -> np.ndarray:
+        data = read_table(self.get_empty_path(symbol), dateFields=["date"])
+        return np.array(sorted(data["date"]) if len(data) else list(), dtype="datetime64[D]")
+
+    def get_months(self, startDate: dt.date, endDate: dt.date) -> List[str]:
+        return [get_month(__month) for __month in pd.period_range(startDate, endDate, freq="M")]
+
+    def get_dates(self, data: pd.DataFrame) -> pd.Series:
+        return data["date"] if self.dateType == "date" else pd.to_datetime(data["datetime"]).dt.date
+
+    def read(self, symbol: str, startDate: dt.date, endDate: dt.date) -> pd.DataFrame:
+        months = self.get_months(startDate, endDate-dt.timedelta(days=1))
+        data = [read_table(self.get_path(symbol, __month), dateFields=["date"]) for __month in months]
+        data = [__data for __data in data if len(__data)]
+        if not data: return pd.DataFrame(columns=self.columns)
+        data = pd.concat(data, ignore_index=True)
+        dates = self.get_dates(data)
+        return data[(dates >= startDate) & (dates < endDate)].reset_index(drop=True)
+
+    def write(self, data: pd.DataFrame):
+        if not len(data): return
+        key = self.dateType
+        months = self.get_dates(data).map(get_month)
+        with BAR_STORE_LOCK:
+            for (symbol, month), __data in data[self.columns].groupby([data["symbol"], months], sort=False):
+                path = self.get_path(symbol, month)
+                __data = pd.concat([read_table(path, dateFields=["date"]), __data], ignore_index=True)
+                __data = __data.drop_duplicates(key, keep="last").sort_values(key).reset_index(drop=True)
+                write_table(__data[self.columns], path)
+
+    def mark_empty(self, symbol: str, ranges: List[Tuple[dt.date,dt.date]], tzinfo=EST, today: Optional[dt.date]=None):
+        empty = list()
+        for __start, __end in ranges:
+            if today is not None: __end = min(__end, today)
+            expected = busday_range(__start, __end-dt.timedelta(days=1), tzinfo) if __start < __end else list()
+            if not len(expected): continue
+            stored = np.array(sorted(set(self.get_dates(self.read(symbol, __start, __end)))), dtype="datetime64[D]")
+            empty.append(expected[~np.isin(expected, stored)])
+        empty = np.concatenate(empty) if empty else np.array(list(), dtype="datetime64[D]")
+        if not len(empty): return
+        with BAR_STORE_LOCK:
+            empty = np.union1d(self.read_empty(symbol), empty)
+            write_table(pd.DataFrame({"date": [__date.astype(dt.date) for __date in empty]}), self.get_empty_path(symbol))
+
+    def get_gaps(self, symbol: str, startDate: dt.date, endDate: dt.date, tzinfo=EST,
+                today: Optional[dt.date]=None) -> List[Tuple[dt.date,dt.date]]:
+        expected = busday_range(startDate, endDate-dt.timedelta(days=1), tzinfo)
+        if not len(expected): return list()
+        stored = np.array(sorted(set(self.get_dates(self.read(symbol, startDate, endDate)))), dtype="datetime64[D]")
+        missing = ~np.isin(expected, stored) & ~np.isin(expected, self.read_empty(symbol))
+        if today is not None: missing |= (expected >= np.datetime64(today, "D"))
+        position = np.flatnonzero(missing)
+        if not len(position): return list()
+        breaks = np.flatnonzero(np.diff(position) != 1)
+        starts, ends = position[np.r_[0, breaks+1]], position[np.r_[breaks, len(position)-1]]
+        return [(expected[__start].astype(dt.date), expected[__end].astype(dt.date)+dt.timedelta(days=1))
+                for __start, __end in zip(starts, ends)]
+
+
+###################################################################
+########################## Fetch Coalescer ########################
+###################################################################
+
+def is_cacheable(result: Any) -> bool:
+    if result is None: return False
+    elif isinstance(result, pd.DataFrame):
+        notna = result.notna().any()
+        if isinstance(result.columns, pd.MultiIndex): notna = notna.groupby(level=0).any()
+        return bool(len(result)) and bool(notna.all())
+    try: return bool(len(result))
+    except TypeError: return True
+
+
+class FetchCoalescer(object):
+    __slots__ = ("ttl", "maxsize", "validate", "lock", "flights", "results", "hits", "misses")
+
+    def __init__(self, ttl: float=300., maxsize: int=256, validate: Callable[[Any],bool]=is_cacheable):
+        self.ttl, self.maxsize, self.validate, self.lock = ttl, maxsize, validate, threading.Lock()
+        self.flights, self.results = dict(), dict()
+        self.hits, self.misses = 0, 0
+
+    def get(self, key: Hashable, func: Callable[[],Any]) -> Any:
+        with self.lock:
+            expires, result = self.results.pop(key, (0., None))
+            if time.monotonic() < expires:
+                self.results[key] = (expires, result)
+                self.hits += 1
+                return result
+            future, owner = self.flights.get(key), (key not in self.flights)
+            if owner: future = self.flights[key] = Future()
+            self.hits, self.misses = self.hits+int(not owner), self.misses+int(owner)
+        if not owner: return future.result()
+        try: result = func()
+        except BaseException as exception:
+            with self.lock: self.flights.pop(key, None)
+            future.set_exception(exception)
+            raise exception
+        with self.lock:
+            self.flights.pop(key, None)
+            if (self.ttl > 0) and self.validate(result): self.set_result(key, result)
+        future.set_result(result)
+        return result
+
+    def get_range(self, key: Hashable, ranges: List[Tuple[dt.date,dt.date]], func: Callable[[List],Any],
+                merge: Callable[[List],Any], take: Callable[[Any,List],Any]) -> Any:
+        while True:
+            with self.lock:
+                expires, (covered, result) = self.results.pop(key, (0., (list(), None)))
+                if time.monotonic() < expires: self.results[key] = (expires, (covered, result))
+                else: covered, result = list(), None
+                missing = subtract_ranges(ranges, covered)
+                if not missing:
+                    self.hits += 1
+                    return take(result, ranges)
+                future, owner = self.flights.get(key), (key not in self.flights)
+                if owner: future = self.flights[key] = Future()
+                self.misses += int(owner)
+            if owner: break
+            future.result()
+        try: fetched = func(missing)
+        except BaseException as exception:
+            with self.lock: self.flights.pop(key, None)
+            future.set_exception(exception)
+            raise exception
+        merged = merge([result, fetched]) if result is not None else fetched
+        with self.lock:
+            self.flights.pop(key, None)
+            if (self.ttl > 0) and self.validate(fetched): self.set_result(key, (merge_ranges(covered+missing), merged))
+        future.set_result(None)
+        return take(merged, ranges)
+
+    def set_result(self, key: Hashable, result: Any):
+        now = time.monotonic()
+        self.results.pop(key, None)
+        for __key in [__key for __key, (__expires, _) in self.results.items() if __expires <= now]:
+            self.results.pop(__key)
+        self.results[key] = (now+self.ttl, result)
+        while len(self.results) > self.maxsize:
+            self.results.pop(next(iter(self.results)))
+
+    def clear(self):
+        with self.lock: self.results.clear()
+
+    def get_metrics(self) -> Dict[str,int]:
+        with self.lock: return dict(hits=self.hits, misses=self.misses, inflight=len(self.flights), cached=len(self.results))
+
+
+FETCH_COALESCER = FetchCoalescer()
@@ -0,0 +1,81 @@
+from base.spider import EST, KST, is_working_day, get_busday, busday_range, busday_offset
+
+from workalendar.usa import UnitedStates
+from workalendar.asia import SouthKorea
+from holidays.countries import united_states, south_korea
+
+from typing import Callable, List, Literal
+import argparse
+import datetime as dt
+import time
+
+
+###################################################################
+######################### Legacy Calendar #########################
+###################################################################
+
+def legacy_us_working_day(__date: dt.date) -> bool:
+    calendar, holidays = UnitedStates(), united_states.US()
+    return calendar.is_working_day(__date) & (__date not in holidays)
+
+
+def legacy_kr_working_day(__date: dt.date) -> bool:
+    calendar, holidays = SouthKorea(), south_korea.KR()
+    return calendar.is_working_day(__date) & (__date not in holidays)
+
+
+def legacy_busday(__date: dt.date, is_working_day: Callable[[dt.date],bool],
+                    how: Literal["previous","next"]="previous") -> dt.date:
+    while not is_working_day(__date):
+        __date = __date + dt.timedelta(days=(-1 if how == "previous" else 1))
+    return __date
+
+
+###################################################################
+############################ Benchmark ############################
+###################################################################
+
+LEGACY_CALENDAR = {EST: legacy_us_working_day, KST: legacy_kr_working_day}
+
+
+def timeit(func: Callable) -> float:
+    start = time.perf_counter()
+    func()
+    return time.perf_counter() - start
+
+
+def run(dates: List[dt.date], tzinfo=EST):
+    legacy = LEGACY_CALENDAR[tzinfo]
+    expected, result = list(), list()
+    legacy_time = timeit(lambda: expected.extend(legacy(__date) for __date in dates))
+    working_time = timeit(lambda: result.extend(is_working_day(__date, tzinfo) for __date in dates))
+    assert result == expected, f"is_working_day differs from the legacy calendar ({tzinfo})"
+
+    sample = dates[::7]
+    for how in ("previous", "next"):
+        assert [get_busday(__date, tzinfo, how) for __date in sample] == [legacy_busday(__date, legacy, how) for __date in sample]
+    busday_time = timeit(lambda: [get_busday(__date, tzinfo) for __date in dates])
+
+    busdays = [__date for __date, __is_busday in zip(dates, expected) if __is_busday]
+    range_time = timeit(lambda: busday_range(dates[0], dates[-1], tzinfo))
+    assert [__date.astype(dt.date) for __date in busday_range(dates[0], dates[-1], tzinfo)] == busdays
+    assert busday_offset(busdays[10], 5, tzinfo) == busdays[15]
+
+    print(f"{tzinfo:<12} dates={len(dates):,} legacy={legacy_time:.3f}s is_working_day={working_time:.4f}s "
+            f"get_busday={busday_time:.4f}s busday_range={range_time*1000:.2f}ms speedup={legacy_time/working_time:,.0f}x")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Trading calendar against the per-call holidays+workalendar logic")
+    parser.add_argument("--start", default="2014-01-01")
+    parser.add_argument("--years", type=int, default=10)
+    args = parser.parse_args()
+    start = dt.date.fromisoformat(args.start)
+    end = start.replace(year=start.year+args.years)
+    dates = [start + dt.timedelta(days=__i) for __i in range((end-start).days)]
+    for tzinfo in (EST, KST):
+        run(dates, tzinfo)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,78 @@
+from base.spider import EST, KST, join_aligned, join_asof, to_session_time
+from benchmarks.legacy import timeit
+
+from typing import Dict, List, Tuple
+import argparse
+import datetime as dt
+import numpy as np
+import pandas as pd
+
+SERIES = ["VIX", "USDX", "IRX", "TNX", "CL=F", "KS200", "USD/KRW", "HSI"]
+
+
+def series_frame(dates: pd.DatetimeIndex, drop=.05, seed=0) -> pd.DataFrame:
+    rng = np.random.default_rng(seed)
+    dates = dates[rng.random(len(dates)) >= drop]
+    close = 100 + rng.standard_normal(len(dates)).cumsum()
+    return pd.DataFrame({"date":dates.date, "close":close, "volume":rng.integers(0, 1000, len(dates))})
+
+
+def backfill(years=20) -> Tuple[pd.DataFrame,List[Tuple[pd.DataFrame,Dict[str,str]]]]:
+    dates = pd.bdate_range(end="2026-09-30", periods=years*261)
+    others = [(series_frame(dates, seed=__i+1), {"close":__name}) for __i, __name in enumerate(SERIES)]
+    return series_frame(dates, drop=0), others
+
+
+###################################################################
+########################## Legacy Join ############################
+###################################################################
+
+def legacy_join(data: pd.DataFrame, *others: Tuple[pd.DataFrame,Dict[str,str]], on="date") -> pd.DataFrame:
+    for __frame, __rename in others:
+        data = data.merge(__frame.rename(columns=__rename)[[on]+list(__rename.values())], how="left", on=on)
+    return data
+
+
+def legacy_join_asof(data: pd.DataFrame, *others: Tuple[pd.DataFrame,Dict[str,str],str], on="date", tzinfo=KST,
+                    tolerance: dt.timedelta=dt.timedelta(days=5)) -> pd.DataFrame:
+    data = data.assign(__time=to_session_time(data[on], tzinfo, how="open"))
+    for __frame, __rename, __tzinfo in others:
+        __frame = __frame.rename(columns=__rename)[[on]+list(__rename.values())]
+        __frame = __frame.assign(__time=to_session_time(__frame[on], __tzinfo, how="close")).drop(columns=on)
+        data = pd.merge_asof(data, __frame.sort_values("__time"), on="__time", tolerance=pd.Timedelta(tolerance))
+    return data.drop(columns="__time")
+
+
+###################################################################
+############################ Benchmark ############################
+###################################################################
+
+def check(years=5):
+    data, others = backfill(years)
+    pd.testing.assert_frame_equal(join_aligned(data, *others), legacy_join(data, *others))
+    others = [(__frame, __rename, EST) for __frame, __rename in others[:4]]
+    pd.testing.assert_frame_equal(join_asof(data, *others), legacy_join_asof(data, *others))
+
+
+def run(years=20, repeat=20):
+    data, others = backfill(years)
+    asof = [(__frame, __rename, EST) for __frame, __rename in others]
+    for name, legacy, aligned, frames in (("join", legacy_join, join_aligned, others),
+                                        ("asof", legacy_join_asof, join_asof, asof)):
+        legacy_time = timeit(lambda: [legacy(data, *frames) for _ in range(repeat)]) / repeat
+        new_time = timeit(lambda: [aligned(data, *frames) for _ in range(repeat)]) / repeat
+        print(f"{name:<4} dates={len(data):,} series={len(frames)} legacy={legacy_time*1000:.1f}ms "
+                f"aligned={new_time*1000:.1f}ms speedup={legacy_time/new_time:,.1f}x")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="join_aligned/join_asof against chained merges on a daily backfill")
+    parser.add_argument("--years", type=int, default=20)
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+    check()
+    run(args.years, args.repeat)
+
+
+if __name__ == "__main__":
+    main()
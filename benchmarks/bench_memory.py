@@ -0,0 +1,63 @@
+from base.spider import set_change, set_draw_down
+from benchmarks import legacy
+from benchmarks.legacy import price_frame
+
+from typing import Literal
+import argparse
+import gc
+import resource
+import subprocess
+import sys
+import tracemalloc
+import pandas as pd
+
+MODES = ["legacy", "copy", "inplace"]
+
+
+def apply(data: pd.DataFrame, mode: Literal["legacy","copy","inplace"]="copy") -> pd.DataFrame:
+    if mode == "legacy":
+        return legacy.set_draw_down(legacy.set_change(data, 4), 150., 4)
+    elif mode == "copy":
+        return set_draw_down(set_change(data, 4), 150., 4)
+    else: return set_draw_down(set_change(data, 4, inplace=True), 150., 4, inplace=True)
+
+
+def check(size=5000):
+    for intraday in (True, False):
+        data = price_frame(size, intraday)
+        expected = apply(data, "copy")
+        result = apply(data.copy(), "inplace")
+        pd.testing.assert_frame_equal(result.reset_index(drop=True), expected[list(result.columns)])
+
+
+def measure(size: int, mode: Literal["legacy","copy","inplace"]="copy"):
+    data = price_frame(size)
+    inputSize = data.memory_usage(deep=False).sum()
+    gc.collect()
+    base = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    apply(data, mode)
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    data = price_frame(size)
+    gc.collect()
+    tracemalloc.start()
+    apply(data, mode)
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    print(f"{mode:<8} rows={size:,} input={inputSize/2**20:.0f}MiB tracemalloc={peak/2**20:.0f}MiB "
+            f"peakRSS={rss/2**10:.0f}MiB (+{(rss-base)/2**10:.0f}MiB)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Peak memory of the price helpers with and without inplace")
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--mode", choices=MODES)
+    args = parser.parse_args()
+    if args.mode:
+        return measure(args.rows, args.mode)
+    check()
+    for mode in MODES:
+        subprocess.run([sys.executable, "-m", "benchmarks.bench_memory", "--rows", str(args.rows), "--mode", mode], check=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,47 @@
+from base.spider import set_change, set_draw_down
+from benchmarks import legacy
+from benchmarks.legacy import price_frame, timeit
+
+from typing import Optional
+import argparse
+import pandas as pd
+
+
+def price_changes(data: pd.DataFrame, maxPrice: Optional[float]=None, trunc: Optional[int]=4) -> pd.DataFrame:
+    return set_draw_down(set_change(data, trunc), maxPrice, trunc)
+
+
+def legacy_price_changes(data: pd.DataFrame, maxPrice: Optional[float]=None, trunc: Optional[int]=4) -> pd.DataFrame:
+    return legacy.set_draw_down(legacy.set_change(data, trunc), maxPrice, trunc)
+
+
+def check(size=20000):
+    for intraday in (True, False):
+        data = price_frame(size, intraday)
+        for trunc in (4, None):
+            pd.testing.assert_frame_equal(price_changes(data, None, trunc), legacy_price_changes(data, None, trunc),
+                                        check_exact=False, rtol=0, atol=1e-12)
+        pd.testing.assert_frame_equal(set_draw_down(data, 150., 4), legacy.set_draw_down(data, 150., 4), check_dtype=False)
+    data = price_frame(size).drop(columns="date")
+    pd.testing.assert_frame_equal(set_change(data, 4), legacy.set_change(data, 4))
+
+
+def run(size: int, intraday=True, trunc: Optional[int]=4):
+    data = price_frame(size, intraday)
+    legacy_time = timeit(legacy_price_changes, data, None, trunc)
+    new_time = timeit(price_changes, data, None, trunc)
+    print(f"{('intraday' if intraday else 'daily'):<8} rows={size:,} trunc={trunc} "
+            f"legacy={legacy_time:.2f}s vectorized={new_time:.3f}s speedup={legacy_time/new_time:,.1f}x")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="set_change/set_draw_down against the row-wise implementation")
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    args = parser.parse_args()
+    check()
+    for intraday in (True, False):
+        run(args.rows, intraday)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,83 @@
+from base.spider import PRICE_COLUMNS, PRICE_CHANGES
+
+from typing import Optional
+from numbers import Real
+import numpy as np
+import pandas as pd
+import time
+
+
+###################################################################
+########################## Legacy Price ###########################
+###################################################################
+
+def _round(x: float, trunc: Optional[int]=2) -> float:
+    return round(x, trunc) if isinstance(trunc, int) and isinstance(x, float) and pd.notna(x) else x
+
+
+def set_change(data: pd.DataFrame, trunc: Optional[int]=4) -> pd.DataFrame:
+    if "close" not in data:
+        return data
+    if "previousClose" not in data:
+        data = set_previous_close(data)
+    return _calc_change_by_price(data, trunc=trunc)
+
+
+def set_previous_close(data: pd.DataFrame) -> pd.DataFrame:
+    data = data.copy()
+    if "datetime" in data:
+        if "date" not in data:
+            data["date"] = data["datetime"].apply(lambda x: x.date())
+        daily = (data[data["volume"]>0].groupby("date").agg({"close":"last"}).
+                reset_index().rename(columns={"close":"previousClose"}))
+        daily["date"] = daily["date"].shift(-1)
+        return data.merge(daily[daily["date"].notna()], how="left", on="date")
+    data["previousClose"] = data["close"].shift(1)
+    return data
+
+
+def _calc_change_by_price(data: pd.DataFrame, trunc: Optional[int]=4) -> pd.DataFrame:
+    data = data.copy()
+    for column, price in zip(PRICE_CHANGES, PRICE_COLUMNS):
+        if (price == "open") and ("datetime" in data): continue
+        elif price in data:
+            data[column] = ((data[price] - data["previousClose"]) / data["previousClose"]).apply(lambda x: _round(x, trunc))
+    return data
+
+
+def set_draw_down(data: pd.DataFrame, maxPrice: Optional[Real]=None, trunc: Optional[int]=4) -> pd.DataFrame:
+    if ("high" not in data) or ("close" not in data): return data
+    elif isinstance(maxPrice, (float,int)):
+        data = pd.concat([pd.DataFrame([{"high":maxPrice}], columns=data.columns), data])
+    else: data = data.copy()
+    data["maxPrice"] = data["high"].cummax()
+    if isinstance(maxPrice, (float,int)):
+        data = data.iloc[1:].copy()
+    data["drawDown"] = ((data["close"] - data["maxPrice"]) / data["maxPrice"]).apply(lambda x: _round(x, trunc))
+    return data
+
+
+###################################################################
+########################### Price Frame ###########################
+###################################################################
+
+def price_frame(size: int, intraday=True, seed=0) -> pd.DataFrame:
+    rng = np.random.default_rng(seed)
+    if intraday:
+        data = pd.DataFrame({"datetime":pd.date_range("2015-01-02 04:00", periods=size, freq="1h", tz="US/Eastern")})
+        data["date"] = data["datetime"].apply(lambda x: x.date())
+    else: data = pd.DataFrame({"date":(np.datetime64("1990-01-01") + np.arange(size)).astype(object)})
+    close = 100 + rng.standard_normal(size).cumsum()
+    data["open"] = close + rng.standard_normal(size)
+    data["high"] = close + abs(rng.standard_normal(size))
+    data["low"] = close - abs(rng.standard_normal(size))
+    data["close"] = close
+    data["volume"] = np.where(rng.random(size) < .3, 0, rng.integers(1, 1000, size))
+    data.loc[rng.random(size) < .02, "close"] = np.nan
+    return data
+
+
+def timeit(func, *args, **kwargs) -> float:
+    start = time.perf_counter()
+    func(*args, **kwargs)
+    return time.perf_counter() - start
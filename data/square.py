@@ -41,14 +41,17 @@ SQUARE_DETAIL_INFO = lambda: Info(
 ###################################################################
 
 CANDLE_LIMIT = 1000
+CANDLE_CURSOR = "before"
+
+SESSION_MINUTES = 390
 
 SQUARE_PRICE_FIELDS = ["date", "open", "high", "low", "close", "volume"]
 
-SQUARE_PRICE_PARAMS = lambda freq="day", limit=600: {
+SQUARE_PRICE_PARAMS = lambda freq="day", limit=600, cursor=None: dict({
     "freq": f"minute-{freq}" if isinstance(freq, int) else freq,
     "limit": min(limit, CANDLE_LIMIT),
     "include_current_candle": "false"
-}
+}, **({CANDLE_CURSOR: cursor} if cursor else dict()))
 
 
 SQUARE_PRICE_QUERY = lambda: Query(
@@ -67,6 +70,7 @@ STOCK_PRICE_KR_QUERY = lambda: PipelineQuery(
     Variable(name="startTime", type="DATETIME", desc="시작일시", iterable=False, default=None),
     Variable(name="endTime", type="DATETIME", desc="종료일시", iterable=False, default=None),
     Variable(name="trunc", type="INTEGER", desc="반올림위치", iterable=False, default=2),
+    Variable(name="resample", type="BOOLEAN", desc="리샘플링", iterable=False, default=False),
 )
 
 
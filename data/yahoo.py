@@ -6,8 +6,9 @@ from gscraper.base.types import Timezone
 from gscraper.utils.cast import get_timezone
 from gscraper.utils.date import now
 
-from typing import Dict, Optional
+from typing import Dict, List, Optional
 import datetime as dt
+import pandas as pd
 
 
 ###################################################################
@@ -21,6 +22,34 @@ YAHOO_TICKER_SECTION = [
 
 YAHOO_PRICE_HINT = ["Strong Buy", "Buy", "Hold", "Underperform", "Sell"]
 
+YAHOO_TICKER_MODULES = {
+    "summary": ["price", "quoteType", "summaryDetail", "financialData"],
+    "regular": ["price", "summaryDetail"],
+    "prepost": ["summaryDetail"],
+    "valuation": ["summaryDetail", "defaultKeyStatistics"],
+    "trading": ["summaryDetail", "defaultKeyStatistics"],
+    "share": ["summaryDetail", "defaultKeyStatistics"],
+    "dividend": ["summaryDetail", "defaultKeyStatistics"],
+    "fiscal": ["defaultKeyStatistics"],
+    "profitability": ["financialData", "defaultKeyStatistics"],
+    "management": ["financialData"],
+    "income": ["financialData", "defaultKeyStatistics"],
+    "sheet": ["financialData", "defaultKeyStatistics"],
+    "cash": ["financialData"],
+    "profile": ["assetProfile"],
+    "governance": ["assetProfile"],
+    "analysis": ["financialData", "summaryDetail"],
+}
+
+def get_yahoo_modules(section: List[str]) -> List[str]:
+    return list(dict.fromkeys([__module for __section in section for __module in YAHOO_TICKER_MODULES.get(__section, list())]))
+
+def flatten_yahoo_summary(response: Dict, modules: List[str]=list()) -> Dict:
+    result = ((response.get("quoteSummary") or dict()).get("result") or [dict()])[0] if isinstance(response, Dict) else dict()
+    unwrap = lambda __value: (__value.get("raw") if __value else None) if isinstance(__value, Dict) and (not __value or "raw" in __value) else __value
+    return {__key: unwrap(__value) for __module in (modules if modules else list(result.keys()))
+            for __key, __value in (result.get(__module) or dict()).items()}
+
 YAHOO_TICKER_QUERY = lambda: Query(
     Variable(name="symbol", type="STRING", desc="Symbol", iterable=True),
     Variable(name="section", type="STRING", desc="Section", iterable=True, default=["summary"]),
@@ -253,10 +282,14 @@ YAHOO_QUERY_FIELDS = [
     "corporateActions",
 ]
 
-def get_yahoo_params(**kwargs) -> Dict:
+YAHOO_CRUMB = "3y1.e/IRjsL"
+
+YAHOO_CREDENTIAL_TTL = 1800
+
+def get_yahoo_params(crumb: str=YAHOO_CRUMB, **kwargs) -> Dict:
     return dict({
         "formatted": "true",
-        "crumb": "3y1.e/IRjsL",
+        "crumb": crumb,
         "lang": "en-US",
         "region": "US",
         "corsDomain": "finance.yahoo.com",
@@ -302,6 +335,9 @@ YAHOO_DATE_LIMIT = {
     "1m":30, "2m":60, "5m":60, "15m":60, "30m":60, "60m":730, "90m":60,
     "1h":730, "1d":None, "5d":None, "1wk":None, "1mo":None, "3mo":None}
 
+YAHOO_WINDOW_LIMIT = {
+    "1m":7, "2m":60, "5m":60, "15m":60, "30m":60, "60m":730, "90m":60, "1h":730}
+
 def _get_date(__m: Dict) -> dt.date:
     return (__m["Date"] if "Date" in __m else __m["Datetime"])
 
@@ -314,6 +350,21 @@ def _get_datetime(__m: Dict, tzinfo: Optional[Timezone]=None, **kwargs) -> dt.da
     else: return None
 
 
+def _get_date_column(__df: pd.DataFrame, **kwargs) -> List[dt.date]:
+    index = __df.index.tz_localize(None) if getattr(__df.index, "tz", None) else __df.index
+    return index.date.tolist()
+
+def _get_datetime_column(__df: pd.DataFrame, tzinfo: Optional[Timezone]=None, **kwargs) -> Optional[List[pd.Timestamp]]:
+    if (__df.index.name != "Datetime") or not isinstance(__df.index, pd.DatetimeIndex): return None
+    tzinfo, index = get_timezone(tzinfo), __df.index
+    if not index.tz: return list(index)
+    else: return list(index.tz_convert(tzinfo) if tzinfo else index.tz_localize(None))
+
+YAHOO_PRICE_COLUMNS = {"date":_get_date_column, "datetime":_get_datetime_column}
+
+YAHOO_BAR_COLUMNS = {"Open":"open", "High":"high", "Low":"low", "Close":"close", "Adj Close":"adjClose", "Volume":"volume"}
+
+
 YAHOO_PRICE_QUERY = lambda: Query(
     Variable(name="symbol", type="STRING", desc="티커", iterable=True),
     Variable(name="startDate", type="DATE", desc="시작일자", iterable=False, default=None),
@@ -330,6 +381,7 @@ DAILY_INDEX_QUERY = lambda: PipelineQuery(
     Variable(name="maxPrice", type="FLOAT", desc="최고가", iterable=False, default=None),
     Variable(name="trunc", type="INTEGER", desc="반올림위치", iterable=False, default=2),
     Variable(name="tzinfo", type=None, desc="시간대", iterable=False, default=None),
+    Variable(name="storePath", type="STRING", desc="저장경로", iterable=False, default=None),
 )
 
 
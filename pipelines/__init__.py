@@ -1,4 +1,4 @@
 from gscraper.base.spider import Pipeline, AsyncPipeline, Dag, Task, INVALID_VALUE_MSG
 
 from base.abstract import ALPHA, NAVER, SQUARE, YAHOO
-from base.spider import EST, KST, Code, Symbol
+from base.spider import EST, KST, Code, Symbol, prune_dags, resample_ohlcv
@@ -1,17 +1,19 @@
-from pipelines import Pipeline, AsyncPipeline, Dag, Task
+from pipelines import Pipeline, AsyncPipeline, Dag, Task, KST, prune_dags, resample_ohlcv
 
-from spiders.square import SquarePriceSpider
-from data.square import STOCK_PRICE_KR_INFO
+from spiders.square import SquarePriceSpider, cast_candles
+from data.square import STOCK_PRICE_KR_INFO, SESSION_MINUTES
 from data import KR_STOCK_PRICE_SCHEMA
 
 from spiders.square import SquareWatchlistSpider, SquareWatchlistUpload, SquareWatchlistDelete
 from data.square import SQUARE_WATCHLIST_PLUS_INFO, SQUARE_WATCHLIST_CLEAR_INFO
 
-from gscraper.base.types import _KT, _VT, Arguments, Context, IndexLabel, Keyword, DateFormat
+from gscraper.base.types import _KT, _VT, Arguments, Context, TypeHint, IndexLabel, Keyword, DateFormat
 from gscraper.base.types import Records, Data, MappedData
 from gscraper.utils.map import kloc
 
 from typing import Dict, List, Optional, Tuple, Union
+import math
+import pandas as pd
 
 
 ###################################################################
@@ -24,11 +26,17 @@ HOURLY_PRICE_FIELDS = ["code", "datetime"] + PRICE_FIELDS
 
 QUERY_TYPE = ["stock_1d", "stock_1h", "stock_1m", "etf_1d"]
 QUERY_FREQ = {"stock_1d":"day", "stock_1h":60, "stock_1m":1, "etf_1d":"day"}
+STOCK_FREQ = {"stock_1d":390, "stock_1h":60, "stock_1m":1}
+
+get_session_bars = lambda freq: math.ceil(SESSION_MINUTES/freq)
 
 def add_id_params(queryMap: Dict[str,Dict[str,List[str]]], __type: str, id: str, code: str, **kwargs):
     queryMap[__type]["id"].append(id)
     queryMap[__type]["code"].append(code)
 
+def add_resample_params(resampleMap: Dict[str,Dict[str,List[str]]], __type: str, source: str, code: str, **kwargs):
+    resampleMap[__type].setdefault(source, list()).append(code)
+
 class StockPriceKrPipeline(AsyncPipeline):
     operation = "stockPriceKr"
     fields = {"stock_1d":DAILY_PRICE_FIELDS, "stock_1h":HOURLY_PRICE_FIELDS, "stock_1m":HOURLY_PRICE_FIELDS, "etf_1d":DAILY_PRICE_FIELDS}
@@ -48,32 +56,82 @@ class StockPriceKrPipeline(AsyncPipeline):
 
     @AsyncPipeline.init_task
     async def crawl(self, query: Records, limit=600, startTime: Optional[DateFormat]=None, endTime: Optional[DateFormat]=None,
-                    trunc: Optional[int]=2, **context) -> MappedData:
+                    trunc: Optional[int]=2, resample=False, **context) -> MappedData:
         context = self.validate_context(**self.from_locals(locals()))
         return await self.gather(**context)
 
-    def validate_context(self, query: Records, **context) -> Context:
+    def validate_context(self, query: Records, resample=False, **context) -> Context:
         queryMap = {__type: dict(id=list(), code=list()) for __type in QUERY_TYPE}
+        resampleMap = {__type: dict() for __type in STOCK_FREQ}
         for __q in query:
             freq = __q.get("freq", "day")
             if __q.get("etf"): add_id_params(queryMap, "etf_1d", **__q)
             elif isinstance(freq, (float,int)):
-                if freq <= 390: add_id_params(queryMap, "stock_1d", **__q)
-                if freq <= 60: add_id_params(queryMap, "stock_1h", **__q)
-                if freq <= 1: add_id_params(queryMap, "stock_1m", **__q)
+                types = [__type for __type, __freq in STOCK_FREQ.items() if freq <= __freq]
+                for __type in (types[-1:] if resample else types): add_id_params(queryMap, __type, **__q)
+                for __type in (types[:-1] if resample else list()): add_resample_params(resampleMap, __type, types[-1], **__q)
             elif freq == "day": add_id_params(queryMap, "stock_1d", **__q)
             elif freq == "minute-60": add_id_params(queryMap, "stock_1h", **__q)
             elif freq == "minute-1": add_id_params(queryMap, "stock_1m", **__q)
             else: continue
-        return dict(context, queryMap=queryMap)
+        return dict(context, queryMap=queryMap, resampleMap=resampleMap)
+
+    async def gather(self, fields: Union[IndexLabel,Dict[str,IndexLabel]]=list(), returnType: Optional[TypeHint]=None,
+                    queryMap: Dict[str,Dict[str,List[str]]]=dict(), resampleMap: Dict[str,Dict[str,List[str]]]=dict(),
+                    **context) -> MappedData:
+        data = dict()
+        if isinstance(fields, Dict): resampleMap = {__type: __map for __type, __map in resampleMap.items() if __type in fields}
+        sources = {__source for __map in resampleMap.values() for __source in __map}
+        for task in prune_dags(self.dags, (fields if isinstance(fields, Dict) else list()), required=sources):
+            if not queryMap.get(task["dataName"], dict()).get("id"): continue
+            data[task["dataName"]] = await self.run_task(task, fields=fields, data=data, queryMap=queryMap,
+                                                        resampleMap=resampleMap, **context)
+        limit = context.get("limit") if context.get("startTime") is None else None
+        for __type, __map in resampleMap.items():
+            for __source, __codes in __map.items():
+                codes = set(__codes) - set(queryMap[__type]["code"])
+                resampled = self.resample_price(data.get(__source, list()), codes, QUERY_FREQ[__type], context.get("trunc"), limit)
+                if resampled: data[__type] = list(data.get(__type, list())) + resampled
+        for __source in sources:
+            if __source in data: data[__source] = self.tail_price(data[__source], limit)
+        return self.map_reduce(fields=fields, returnType=returnType, **dict(context, queryMap=queryMap, **data))
 
     @AsyncPipeline.validate_data
     @AsyncPipeline.limit_request
-    async def crawl_price(self, worker: SquarePriceSpider, queryMap: Dict[str,Dict[str,List[str]]], key: str, **params) -> Records:
-        params.update(queryMap[key])
+    async def crawl_price(self, worker: SquarePriceSpider, queryMap: Dict[str,Dict[str,List[str]]], key: str,
+                        resampleMap: Dict[str,Dict[str,List[str]]]=dict(), **params) -> Records:
+        params = self.get_price_params(queryMap, key, resampleMap, **params)
         if not (params.get("id") and params.get("code")): return list()
         else: return await worker.crawl(**params)
 
+    def get_price_params(self, queryMap: Dict[str,Dict[str,List[str]]], key: str,
+                        resampleMap: Dict[str,Dict[str,List[str]]]=dict(), **params) -> Dict:
+        params = dict(params, **queryMap[key], freq=QUERY_FREQ[key])
+        targets = [__type for __type, __map in resampleMap.items() if key in __map]
+        if targets and isinstance(params.get("limit"), int):
+            sessions = max(math.ceil(params["limit"]/get_session_bars(STOCK_FREQ[__type])) for __type in targets)
+            params["limit"] = max(params["limit"], sessions*get_session_bars(params["freq"]))
+        return params
+
+    def resample_price(self, data: Records, codes: List[str], freq: Union[str,int]="day", trunc: Optional[int]=2,
+                        limit: Optional[int]=None) -> Records:
+        data = pd.DataFrame(data)
+        if not (codes and len(data) and ("datetime" in data) and ("code" in data)): return list()
+        data = resample_ohlcv(data[data["code"].isin(codes)], freq, tzinfo=KST, on="datetime", groupby="code")
+        if isinstance(limit, int): data = data.groupby("code", sort=False).tail(limit)
+        columns = {__column: data[__column].tolist() for __column in data.columns}
+        for __field in self.info.get("price"):
+            if __field["name"] in columns:
+                columns[__field["name"]] = cast_candles(data[__field["name"]].to_numpy(float), __field["type"], trunc)
+        return [dict(zip(columns.keys(), __row)) for __row in zip(*columns.values())]
+
+    def tail_price(self, data: Records, limit: Optional[int]=None, on="datetime") -> Records:
+        if not (isinstance(limit, int) and data): return data
+        frame = pd.DataFrame(data)
+        if not (("code" in frame) and (on in frame)): return data
+        index = frame.sort_values(["code", on], kind="stable").groupby("code", sort=False).tail(limit).index
+        return [data[__i] for __i in sorted(index)]
+
     @AsyncPipeline.arrange_data
     def map_reduce(self, stock_1d: Records=list(), stock_1h: Records=list(), stock_1m: Records=list(),
                     etf_1d: Records=list(), **context) -> MappedData:
@@ -1,17 +1,20 @@
-from pipelines import Pipeline, Dag, Task, EST, KST
-from base.spider import get_busday, set_change, set_draw_down
+from pipelines import Pipeline, Dag, Task, EST, KST, prune_dags
+from base.spider import HKT, get_busday, busday_range, set_change, set_draw_down, join_aligned, join_asof
+from base.store import read_table, append_table, get_table_tail, between_table
 
 from spiders.yahoo import YahooPriceSpider
 from data.yahoo import DAILY_NASDAQ_INFO, DAILY_KOSPI_INFO, DAILY_KOSDAQ_INFO
 
 from gscraper.base.types import TypeHint, IndexLabel, DateFormat, Timezone, Data
-from gscraper.utils.map import cloc
+from gscraper.utils.map import cloc, notna
 
-from typing import Dict, Literal, Optional
+from typing import Dict, List, Optional
 from numbers import Real
 from abc import ABCMeta
+from concurrent.futures import ThreadPoolExecutor
 
 import datetime as dt
+import numpy as np
 import pandas as pd
 
 
@@ -32,28 +35,89 @@ POST_PRICE_FIELDS = ["postHigh", "postHighPct", "postLow", "postLowPct", "postCh
 POST_PRICE_RENAME = {lower_first(__field.replace("post", '')): __field for __field in POST_PRICE_FIELDS}
 
 PREPOST_FIELDS = PRE_PRICE_FIELDS + POST_PRICE_FIELDS
+PREPOST_RENAME = {"pre": PRE_PRICE_RENAME, "post": POST_PRICE_RENAME}
+
+PRE_MARKET_CLOSE = (9*3600 + 30*60) * 10**6
+POST_MARKET_OPEN = (16*3600) * 10**6
 
 DRAWDOWN_FIELDS = ["maxPrice", "drawDown"]
 
+ASOF_TOLERANCE = dt.timedelta(days=5)
+
+class TaskErrors(Exception):
+    def __init__(self, errors: Dict[str,Exception]):
+        self.errors = errors
+        super().__init__(f"{len(errors)} tasks failed: " + ", ".join(f"{__name} ({__error!r})" for __name, __error in errors.items()))
+
+
 class DailyPipeline(Pipeline):
     __metaclass__ = ABCMeta
     operation = "dailyPipeline"
+    numTasks = 8
+    lineage = dict()
+    lookback = dict()
 
     @Pipeline.init_task
     def crawl(self, startDate: Optional[DateFormat]=None, endDate: Optional[DateFormat]=None,
-                maxPrice: Optional[Real]=None, trunc: Optional[int]=2, tzinfo: Optional[Timezone]=None, **context) -> Data:
+                maxPrice: Optional[Real]=None, trunc: Optional[int]=2, tzinfo: Optional[Timezone]=None,
+                storePath: Optional[str]=None, **context) -> Data:
         startDate, endDate = self.get_date_pair(startDate, endDate, if_null=(1,0))
         startDate, endDate = get_busday(startDate, tzinfo), get_busday(endDate, tzinfo)
-        context = self.from_locals(locals(), ranges=[dict(field="date", left=startDate, right=endDate)], drop=["symbol"])
-        return self.gather(**context)
+        context = self.from_locals(locals(), ranges=[dict(field="date", left=startDate, right=endDate)], drop=["symbol","storePath"])
+        if storePath: return self.crawl_incremental(storePath, **context)
+        else: return self.gather(**context)
+
+    def crawl_incremental(self, storePath: str, startDate: dt.date, endDate: dt.date, maxPrice: Optional[Real]=None,
+                        tzinfo: Optional[Timezone]=None, fields: IndexLabel=list(), returnType: Optional[TypeHint]=None,
+                        ranges=list(), **context) -> Data:
+        stored, tzinfo = read_table(storePath), (self.tzinfo if tzinfo is None else tzinfo)
+        tail, context = get_table_tail(stored), dict(context, tzinfo=tzinfo, fields=list(), returnType="dataframe")
+        if (tail is None) or len(busday_range(startDate, stored["date"].min()-dt.timedelta(days=1), tzinfo)):
+            data = self.gather(startDate=startDate, endDate=endDate, maxPrice=maxPrice, ranges=ranges, **context)
+        elif len(busday_range(tail["date"]+dt.timedelta(days=1), endDate, tzinfo)):
+            lastDate, maxPrice = tail["date"], (tail["maxPrice"] if notna(tail.get("maxPrice")) else maxPrice)
+            data = self.gather(startDate=lastDate, endDate=endDate, maxPrice=maxPrice,
+                                ranges=[dict(field="date", left=lastDate, right=endDate)], **context)
+            data = data[data["date"] > lastDate] if len(data) else data
+        else: return self.filter_data(between_table(stored, startDate, endDate), fields=fields, returnType=returnType)
+        data = append_table(data, storePath, on="date", stored=stored)
+        return self.filter_data(between_table(data, startDate, endDate), fields=fields, returnType=returnType)
 
     def gather(self, fields: IndexLabel=list(), returnType: Optional[TypeHint]=None, trunc: Optional[int]=2, **context) -> Data:
-        data = dict()
-        for task in self.dags:
-            data[task["dataName"]] = self.run_task(task, symbol=[task["dataName"]], trunc=trunc, **context)
+        data = self.gather_tasks(fields=fields, trunc=trunc, **context)
         trunc = trunc+2 if isinstance(trunc, int) else None
         return self.map_reduce(data=data, fields=fields, returnType=returnType, **context)
 
+    def gather_tasks(self, fields: IndexLabel=list(), numTasks: Optional[int]=None, **context) -> Dict[str,Data]:
+        dags = self.get_dags(fields)
+        numTasks = numTasks if isinstance(numTasks, int) and numTasks > 0 else self.numTasks
+        with ThreadPoolExecutor(max_workers=max(min(numTasks, len(dags)), 1)) as executor:
+            futures = [(task, executor.submit(self.run_task, task, symbol=[task["dataName"]], **self.get_task_context(task, **context)))
+                        for task in dags]
+            data, failed = dict(), dict()
+            for task, future in futures:
+                try: data[task["dataName"]] = future.result()
+                except Exception as exception:
+                    if self.is_interrupt(exception): raise exception
+                    self.log_errors(func=self.run_task, msg={"task":task["name"], "dataName":task["dataName"], "error":repr(exception)})
+                    failed[task["dataName"]] = exception
+        if len(failed) == 1: raise next(iter(failed.values()))
+        elif failed: raise TaskErrors(failed) from next(iter(failed.values()))
+        return dict(data, **{task["dataName"]: pd.DataFrame(columns=list(task["fields"]))
+                            for task in self.dags if task["dataName"] not in data})
+
+    def get_dags(self, fields: IndexLabel=list()) -> List[Task]:
+        return prune_dags(self.dags, fields, self.lineage, required=[self.dags[0]["dataName"]])
+
+    def get_task_context(self, task: Task, startDate: Optional[dt.date]=None, endDate: Optional[dt.date]=None,
+                        ranges=list(), **context) -> Dict:
+        endDate = endDate+dt.timedelta(days=1) if isinstance(endDate, dt.date) else endDate
+        lookback = self.lookback.get(task["dataName"])
+        if not (lookback and isinstance(startDate, dt.date)): return dict(context, startDate=startDate, endDate=endDate, ranges=ranges)
+        startDate = startDate - lookback
+        ranges = [(dict(__range, left=startDate) if __range.get("field") == "date" else __range) for __range in ranges]
+        return dict(context, startDate=startDate, endDate=endDate, ranges=ranges)
+
 
 US_INDEX_SYMBOLS = ["^IXIC", "^VIX", "DX-Y.NYB", "^IRX", "^TNX", "CL=F", "BTC-USD"]
 US_INDEX_FIELDS = ["VIX", "USDX", "IRX", "TNX", "CL=F"]
@@ -66,6 +130,8 @@ DAILY_NASDAQ_FIELDS = PRICE_CHANGE_FIELDS + PREPOST_FIELDS + DRAWDOWN_FIELDS + U
 class DailyNasdaqPipeline(DailyPipeline):
     operation = "dailyNasdaq"
     fields = DAILY_NASDAQ_FIELDS
+    lineage = {"QQQ": PREPOST_FIELDS, "^VIX": ["VIX"], "DX-Y.NYB": ["USDX"], "^IRX": ["IRX"], "^TNX": ["TNX"],
+                "CL=F": ["CL=F"], "BTC-USD": BTC_FIELDS}
     tzinfo = EST
     returnType = "dataframe"
     info = DAILY_NASDAQ_INFO()
@@ -90,40 +156,40 @@ class DailyNasdaqPipeline(DailyPipeline):
 
     @Pipeline.arrange_data
     def map_reduce(self, data: Dict[str,pd.DataFrame], maxPrice: Optional[Real]=None, trunc: Optional[int]=4, **context) -> Data:
-        return (set_draw_down(set_change(data["^IXIC"], trunc), maxPrice, trunc).
-            merge(self.map_prepost_price(set_change(data["QQQ"], trunc), data["^IXIC"]), how="left", on="date").
-            merge(data["^VIX"].rename(columns={"close":"VIX"}), how="left", on="date").
-            merge(data["DX-Y.NYB"].rename(columns={"close":"USDX"}), how="left", on="date").
-            merge(data["^IRX"].rename(columns={"close":"IRX"}), how="left", on="date").
-            merge(data["^TNX"].rename(columns={"close":"TNX"}), how="left", on="date").
-            merge(data["CL=F"].rename(columns={"close":"CL=F"}), how="left", on="date").
-            merge(set_change(data["BTC-USD"], trunc).rename(columns=BTC_RENAME)[["date"]+BTC_FIELDS], how="left", on="date"))
+        return join_aligned(set_draw_down(set_change(data["^IXIC"], trunc), maxPrice, trunc),
+            self.map_prepost_price(set_change(data["QQQ"], trunc), data["^IXIC"]),
+            (data["^VIX"], {"close":"VIX"}),
+            (data["DX-Y.NYB"], {"close":"USDX"}),
+            (data["^IRX"], {"close":"IRX"}),
+            (data["^TNX"], {"close":"TNX"}),
+            (data["CL=F"], {"close":"CL=F"}),
+            (set_change(data["BTC-USD"], trunc), BTC_RENAME), on="date")
 
     def map_prepost_price(self, prepost: pd.DataFrame, daily: pd.DataFrame) -> pd.DataFrame:
-        if prepost.empty: return pd.DataFrame(columns=["date"]+PRE_PRICE_FIELDS+POST_PRICE_FIELDS)
-        pre, post = self.agg_daily_prepost(prepost, daily, type="pre"), self.agg_daily_prepost(prepost, daily, type="post")
-        pre, post = pre.rename(columns=PRE_PRICE_RENAME), post.rename(columns=POST_PRICE_RENAME)
-        return cloc(pre.merge(post, how="outer", on="date"), columns=["date"]+PREPOST_FIELDS, if_null="drop")
-
-    def agg_daily_prepost(self, prepost: pd.DataFrame, daily: pd.DataFrame, type: Literal["pre","post"]) -> pd.DataFrame:
-        data = self.filter_prepost_time(prepost, type)
-        if "change" in data:
-            data = data.groupby("date").agg({"high":"max","highPct":"max","low":"min","lowPct":"min"}).reset_index()
-            data = data.merge(daily[["date","open"]], how="left", on="date")
-            data["change"] = data.apply(lambda row: self.calc_prepost_change(row), axis=1)
-            return data.drop(columns="open")
-        else: return data.groupby("date").agg({"high":"max","low":"min"}).reset_index()
-
-    def filter_prepost_time(self, data: pd.DataFrame, type: Literal["pre","post"]) -> pd.DataFrame:
-        if type == "pre":
-            return data[(data["volume"]==0)&data["datetime"].apply(lambda x: x.time()<=dt.time(9,30))]
-        elif type == "post":
-            return data[(data["volume"]==0)&data["datetime"].apply(lambda x: x.time()>=dt.time(16))]
-        else: return data
-
-    def calc_prepost_change(self, row: pd.Series) -> float:
-        high_lt_low = abs(row["open"]-row["high"]) > abs(row["open"]-row["low"])
-        return row["highPct"] if high_lt_low else row["lowPct"]
+        session = self.label_session(prepost) if len(prepost) else np.array([], dtype=object)
+        if not (session != "regular").any(): return pd.DataFrame(columns=["date"]+PRE_PRICE_FIELDS+POST_PRICE_FIELDS)
+        data = self.agg_daily_prepost(prepost[session != "regular"], session[session != "regular"], daily).unstack("session")
+        fields = data.columns.get_level_values(0)
+        data = pd.DataFrame({rename[__field]: (data[(__field, __session)] if (__field, __session) in data else np.nan)
+                    for __session, rename in PREPOST_RENAME.items() for __field in rename if __field in fields}, index=data.index)
+        return cloc(data.reset_index(), columns=["date"]+PREPOST_FIELDS, if_null="drop")
+
+    def agg_daily_prepost(self, prepost: pd.DataFrame, session: np.ndarray, daily: pd.DataFrame) -> pd.DataFrame:
+        agg = {"high":"max","highPct":"max","low":"min","lowPct":"min"} if "change" in prepost else {"high":"max","low":"min"}
+        data = prepost.groupby([prepost["date"], pd.Series(session, index=prepost.index, name="session")]).agg(agg)
+        if "change" not in prepost: return data
+        opens = daily.drop_duplicates("date", keep="last").set_index("date")["open"]
+        opens = opens.reindex(data.index.get_level_values("date")).to_numpy(dtype=float)
+        high_lt_low = np.abs(opens-data["high"].to_numpy()) > np.abs(opens-data["low"].to_numpy())
+        data["change"] = np.where(high_lt_low, data["highPct"].to_numpy(), data["lowPct"].to_numpy())
+        return data
+
+    def label_session(self, data: pd.DataFrame) -> np.ndarray:
+        datetime = pd.to_datetime(data["datetime"])
+        time = (datetime.dt.hour*3600 + datetime.dt.minute*60 + datetime.dt.second).to_numpy(dtype=np.int64)*10**6
+        time += datetime.dt.microsecond.to_numpy(dtype=np.int64)
+        closed = (data["volume"] == 0).to_numpy()
+        return np.select([closed & (time <= PRE_MARKET_CLOSE), closed & (time >= POST_MARKET_OPEN)], ["pre","post"], "regular")
 
 
 KS_TOP_SYMBOL = "005930.KS"
@@ -141,6 +207,8 @@ DAILY_KOSPI_FIELDS = PRICE_CHANGE_FIELDS + KS_INDEX_FIELDS + TOP_FIELDS + DRAWDO
 class DailyKospiPipeline(DailyPipeline):
     operation = "dailyKospi"
     fields = DAILY_KOSPI_FIELDS
+    lineage = {"^KS200": ["KS200"], "KRW=X": ["USD/KRW"], "^IXIC": ["NASDAQ"], "^HSI": ["HSI"], KS_TOP_SYMBOL: TOP_FIELDS}
+    lookback = {"^IXIC": ASOF_TOLERANCE, "^HSI": ASOF_TOLERANCE}
     tzinfo = KST
     returnType = "dataframe"
     info = DAILY_KOSPI_INFO()
@@ -161,12 +229,12 @@ class DailyKospiPipeline(DailyPipeline):
 
     @Pipeline.arrange_data
     def map_reduce(self, data: Dict[str,pd.DataFrame], maxPrice: Optional[Real]=None, trunc: Optional[int]=4, **context) -> Data:
-        return (set_draw_down(set_change(data["^KS11"], trunc), maxPrice, trunc).
-            merge(data["^KS200"].rename(columns={"close":"KS200"}), how="left", on="date").
-            merge(data["KRW=X"].rename(columns={"close":"USD/KRW"}), how="left", on="date").
-            merge(data["^IXIC"].rename(columns={"close":"NASDAQ"}), how="left", on="date").
-            merge(data["^HSI"].rename(columns={"close":"HSI"}), how="left", on="date").
-            merge(set_change(data[KS_TOP_SYMBOL], trunc).rename(columns=TOP_RENAME)[["date"]+TOP_FIELDS], how="left", on="date"))
+        kospi = join_aligned(set_draw_down(set_change(data["^KS11"], trunc), maxPrice, trunc),
+            (data["^KS200"], {"close":"KS200"}),
+            (data["KRW=X"], {"close":"USD/KRW"}), on="date")
+        kospi = join_asof(kospi, (data["^IXIC"], {"close":"NASDAQ"}, EST), (data["^HSI"], {"close":"HSI"}, HKT),
+            on="date", tzinfo=KST, tolerance=ASOF_TOLERANCE)
+        return join_aligned(kospi, (set_change(data[KS_TOP_SYMBOL], trunc), TOP_RENAME), on="date")
 
 
 KQ_TOP_SYMBOL = "086520.KQ"
@@ -179,6 +247,9 @@ DAILY_KOSDAQ_FIELDS = PRICE_CHANGE_FIELDS + KS_INDEX_FIELDS + TOP_FIELDS + DRAWD
 class DailyKosdaqPipeline(DailyPipeline):
     operation = "dailyKosdaq"
     fields = DAILY_KOSDAQ_FIELDS
+    lineage = {"^KQ100": ["KQ100"], "^KQ47": ["KQ47"], "^KQ26": ["KQ26"], "^KQ15": ["KQ15"], "KRW=X": ["USD/KRW"],
+                "^IXIC": ["NASDAQ"], "^HSI": ["HSI"], KQ_TOP_SYMBOL: TOP_FIELDS}
+    lookback = {"^IXIC": ASOF_TOLERANCE, "^HSI": ASOF_TOLERANCE}
     tzinfo = KST
     returnType = "dataframe"
     info = DAILY_KOSDAQ_INFO()
@@ -205,12 +276,12 @@ class DailyKosdaqPipeline(DailyPipeline):
 
     @Pipeline.arrange_data
     def map_reduce(self, data: Dict[str,pd.DataFrame], maxPrice: Optional[Real]=None, trunc: Optional[int]=4, **context) -> Data:
-        return (set_draw_down(set_change(data["^KQ11"], trunc), maxPrice, trunc).
-            merge(data["^KQ100"].rename(columns={"close":"KQ100"}), how="left", on="date").
-            merge(data["^KQ47"].rename(columns={"close":"KQ47"}), how="left", on="date").
-            merge(data["^KQ26"].rename(columns={"close":"KQ26"}), how="left", on="date").
-            merge(data["^KQ15"].rename(columns={"close":"KQ15"}), how="left", on="date").
-            merge(data["KRW=X"].rename(columns={"close":"USD/KRW"}), how="left", on="date").
-            merge(data["^IXIC"].rename(columns={"close":"NASDAQ"}), how="left", on="date").
-            merge(data["^HSI"].rename(columns={"close":"HSI"}), how="left", on="date").
-            merge(set_change(data[KQ_TOP_SYMBOL], trunc).rename(columns=TOP_RENAME)[["date"]+TOP_FIELDS], how="left", on="date"))
+        kosdaq = join_aligned(set_draw_down(set_change(data["^KQ11"], trunc), maxPrice, trunc),
+            (data["^KQ100"], {"close":"KQ100"}),
+            (data["^KQ47"], {"close":"KQ47"}),
+            (data["^KQ26"], {"close":"KQ26"}),
+            (data["^KQ15"], {"close":"KQ15"}),
+            (data["KRW=X"], {"close":"USD/KRW"}), on="date")
+        kosdaq = join_asof(kosdaq, (data["^IXIC"], {"close":"NASDAQ"}, EST), (data["^HSI"], {"close":"HSI"}, HKT),
+            on="date", tzinfo=KST, tolerance=ASOF_TOLERANCE)
+        return join_aligned(kosdaq, (set_change(data[KQ_TOP_SYMBOL], trunc), TOP_RENAME), on="date")
@@ -1,5 +1,6 @@
 from spiders import FinanceKrAsyncSpider, Flow, KST, get_headers
 from spiders import GET, API, NAVER, URL, Code
+from base.spider import busday_count
 
 from data.naver import NAVER_STOCK_INFO_INFO
 from data.naver import NAVER_INVESTOR_INFO, INDEX_CATEGORY, INVESTOR_COLUMNS
@@ -10,7 +11,6 @@ from gscraper.utils.map import re_get, select_text, fill_array
 from typing import Dict, Literal, Optional, Sequence
 from abc import ABCMeta
 from math import ceil
-import numpy as np
 
 from bs4 import BeautifulSoup
 from io import StringIO
@@ -93,7 +93,7 @@ class NaverInvestorSpider(NaverAsyncSpider):
         startDate, endDate = self.get_date_pair(startDate, endDate, if_null=(None,0), busdate=True)
         dateFilter = dict(context, byDate=byDate, fromDate=startDate, toDate=endDate) if byDate else dict()
         if not isinstance(size, (Sequence,int)):
-            size = (ceil(np.busday_count(startDate, endDate)/self.pageLimit) if startDate else 1) * self.pageLimit
+            size = (ceil(busday_count(startDate, endDate, tzinfo=KST)/self.pageLimit) if startDate else 1) * self.pageLimit
         return dict(context, bizdate=endDate.strftime("%Y%m%d"), size=size, pageSize=self.pageLimit, **dateFilter)
 
     @NaverAsyncSpider.retry_request
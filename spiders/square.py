@@ -1,21 +1,64 @@
-from spiders import FinanceKrAsyncSpider, EncryptedSpider, Flow, KST, get_headers
+from spiders import FinanceKrAsyncSpider, EncryptedSpider, Flow, EST, KST, get_headers
 from spiders import GET, POST, DELETE, API, SQUARE, URL, Code
 
 from data import KR_STOCK_PRICE_SCHEMA
+from base.spider import SESSION_HOURS, busday_count, busday_offset, get_busday
 from data.square import SQUARE_DETAIL_INFO
-from data.square import SQUARE_PRICE_PARAMS, SQUARE_PRICE_INFO, SQUARE_PRICE_FIELDS
+from data.square import SQUARE_PRICE_PARAMS, SQUARE_PRICE_INFO, SQUARE_PRICE_FIELDS, CANDLE_LIMIT, CANDLE_CURSOR, SESSION_MINUTES
 
 from data.square import SQUARE_WATCHLIST_INFO, SQUARE_WATCHLIST_UPLOAD_INFO, SQUARE_WATCHLIST_DELETE_INFO
 
 from gscraper.base.types import IndexLabel, Keyword, Id, DateFormat, Records, Data, JsonData
 from gscraper.utils.cast import cast_timestamp
-from gscraper.utils.map import chain_exists, between
+from gscraper.utils.map import chain_exists, filter_data
 
-from typing import Dict, List, Optional, Union
+from dateutil.tz import tzlocal
+
+from typing import Dict, List, Optional, Tuple, Union
 from abc import ABCMeta
+import asyncio
+import datetime as dt
+import math
+import numpy as np
+import pandas as pd
 import re
 
 
+is_kr_code = lambda code: (not code) or bool(re.match("\d{6}", str(code)))
+
+to_local_date = lambda __ts, tzinfo=KST: pd.Timestamp(__ts, unit="ms", tz="UTC").tz_convert(tzinfo).date()
+
+def to_cursor(__date: dt.date, tzinfo=KST) -> int:
+    return int((pd.Timestamp(__date) + pd.Timedelta(days=1)).tz_localize(tzinfo).timestamp()*1000)
+
+
+def to_session_open(__ts: int, tzinfo=KST) -> int:
+    __date = get_busday(to_local_date(__ts, tzinfo), tzinfo, how="next")
+    return max(__ts, int(pd.Timestamp.combine(__date, SESSION_HOURS[tzinfo][0]).tz_localize(tzinfo).timestamp()*1000))
+
+
+def get_candle_times(response: JsonData) -> List[int]:
+    if not isinstance(response, Dict): return list()
+    return [__row[0] for __row in (response.get("data") or list()) if __row and isinstance(__row[0], (float,int))]
+
+
+def to_candle_array(rows: List[List]) -> np.ndarray:
+    if not rows: return np.empty((0, len(SQUARE_PRICE_FIELDS)), dtype=float)
+    try: return np.array(rows, dtype=float)
+    except (TypeError, ValueError):
+        return pd.DataFrame(list(rows)).iloc[:,:len(SQUARE_PRICE_FIELDS)].apply(pd.to_numeric, errors="coerce").to_numpy(float)
+
+
+def cast_candles(values: np.ndarray, dtype: type, trunc: Optional[int]=None) -> List:
+    isna = np.isnan(values)
+    if dtype is int: values = np.trunc(np.where(isna, 0, values)).astype(np.int64)
+    values = values.astype(object)
+    values[isna] = None
+    if (dtype is float) and isinstance(trunc, int):
+        return [(round(__value, trunc) if __value is not None else None) for __value in values.tolist()]
+    return values.tolist()
+
+
 class SquareAsyncSpider(FinanceKrAsyncSpider):
     __metaclass__ = ABCMeta
     operation = "squareSpider"
@@ -89,23 +132,108 @@ class SquarePriceSpider(SquareAsyncSpider):
         return await self.gather(*args, **context)
 
     @SquareAsyncSpider.retry_request
-    @SquareAsyncSpider.limit_request
     async def fetch(self, id: str, code=str(), freq: Union[str,int]="day", limit=600,
-                    startTime: Optional[int]=None, endTime: Optional[int]=None, trunc=2, **context) -> Records:
+                    startTime: Optional[int]=None, endTime: Optional[int]=None, trunc=2,
+                    semaphore: Optional[asyncio.Semaphore]=None, **context) -> Records:
         url = URL(API, SQUARE, "prices", id)
-        params = SQUARE_PRICE_PARAMS(freq, limit)
-        response = await self.request_json(GET, url, params=params, headers=self.get_headers(url), **context)
+        pages = self.plan_pages(freq, limit, startTime, endTime, tzinfo=(KST if is_kr_code(code) else EST))
+        responses = await asyncio.gather(*[self.fetch_page(url, SQUARE_PRICE_PARAMS(freq, __limit, __cursor),
+                                            semaphore=semaphore, **context) for __limit, __cursor in pages])
+        if not self.is_cursor_applied(pages, responses):
+            self.logger.warning(f"The '{CANDLE_CURSOR}' cursor was ignored for {id} ({freq}). "
+                                f"Falling back to the latest {min(limit, CANDLE_LIMIT)} candles.")
+            responses = [await self.fetch_page(url, SQUARE_PRICE_PARAMS(freq, limit), semaphore=semaphore, **context)]
+        else: responses = await self.fill_pages(url, pages, responses, freq, startTime, endTime, semaphore=semaphore,
+                                                **dict(context, tzinfo=(KST if is_kr_code(code) else EST)))
+        response = self.stitch_pages(responses)
         return self.parse(response, locals=locals())
 
+    @SquareAsyncSpider.limit_request
+    async def fetch_page(self, url: str, params: Dict, **context) -> JsonData:
+        return await self.request_json(GET, url, params=params, headers=self.get_headers(url), **context)
+
+    def plan_pages(self, freq: Union[str,int]="day", limit=600, startTime: Optional[int]=None, endTime: Optional[int]=None,
+                    tzinfo=KST) -> List[Tuple[int,Optional[int]]]:
+        perDay = 1 if freq == "day" else (math.ceil(SESSION_MINUTES/freq) if isinstance(freq, int) and freq > 0 else None)
+        if perDay is None: return [(limit, None)]
+        endDate = to_local_date(endTime, tzinfo) if endTime else self.today()
+        total = busday_count(to_local_date(startTime, tzinfo), endDate+dt.timedelta(days=1), tzinfo)*perDay if startTime else limit
+        total, pageDays = max(total, 1), max(CANDLE_LIMIT // perDay, 1)
+        pageSize = min(pageDays*perDay, CANDLE_LIMIT)
+        if (total <= pageSize) and not endTime: return [(total, None)]
+        cursors = busday_offset(endDate, [-__page*pageDays for __page in range(math.ceil(total/pageSize))], tzinfo)
+        pages = [(pageSize, to_cursor(__date, tzinfo)) for __date in cursors]
+        pages[-1] = (total-pageSize*(len(pages)-1), pages[-1][1])
+        return [((pageSize, None) if (__i == 0) and not endTime else __page) for __i, __page in enumerate(pages)]
+
+    def is_cursor_applied(self, pages: List[Tuple[int,Optional[int]]], responses: List[JsonData]) -> bool:
+        for (__limit, __cursor), __response in zip(pages, responses):
+            times = get_candle_times(__response) if __cursor else list()
+            if times and (max(times) >= __cursor): return False
+        return True
+
+    async def fill_pages(self, url: str, pages: List[Tuple[int,Optional[int]]], responses: List[JsonData],
+                        freq: Union[str,int]="day", startTime: Optional[int]=None, endTime: Optional[int]=None, tzinfo=KST,
+                        semaphore: Optional[asyncio.Semaphore]=None, **context) -> List[JsonData]:
+        fetch = lambda __limit, __cursor: self.fetch_page(url, SQUARE_PRICE_PARAMS(freq, __limit, __cursor), semaphore=semaphore, **context)
+        bounds = [(to_session_open(__cursor, tzinfo) if __cursor else None) for _, __cursor in pages[1:]+[(None, startTime)]]
+        responses = list(responses)
+        for (__limit, _), __response, __bound in zip(pages, list(responses), bounds):
+            times = get_candle_times(__response)
+            while (__bound is not None) and times and (len(times) >= min(__limit, CANDLE_LIMIT)) and (min(times) > __bound):
+                __limit, __response = CANDLE_LIMIT, await fetch(CANDLE_LIMIT, min(times))
+                older = [__ts for __ts in get_candle_times(__response) if __ts < min(times)]
+                if older: responses.append(__response)
+                times = older
+        total = sum(__limit for __limit, _ in pages) if startTime is None else 0
+        times = [__ts for __ts in get_candle_times(self.stitch_pages(responses)) if (endTime is None) or (__ts <= endTime)]
+        while times and (len(times) < total):
+            __response = await fetch(total-len(times), min(times))
+            older = [__ts for __ts in get_candle_times(__response) if __ts < min(times)]
+            if not older: break
+            responses.append(__response)
+            times = times + older
+        return responses
+
+    def stitch_pages(self, responses: List[JsonData]) -> JsonData:
+        if len(responses) == 1: return responses[0]
+        rows = {__row[0]: __row for __response in responses if isinstance(__response, Dict)
+                for __row in (__response.get("data") or list()) if __row and isinstance(__row[0], (float,int))}
+        return dict(responses[0], data=[rows[__ts] for __ts in sorted(rows)])
+
     @SquareAsyncSpider.validate_response
-    def parse(self, response: JsonData, startTime: Optional[int]=None, endTime: Optional[int]=None, **context) -> Records:
-        data = [dict(zip(SQUARE_PRICE_FIELDS, row)) for row in response["data"]
-                if isinstance(row[0], (float,int)) and between(row[0], startTime, endTime)]
-        return self.map(data, **context)
+    def parse(self, response: JsonData, startTime: Optional[int]=None, endTime: Optional[int]=None,
+                id=str(), code=str(), trunc=2, fields: IndexLabel=list(), **context) -> Records:
+        values = self.slice_candles(to_candle_array(response["data"]), startTime, endTime)
+        columns, query = dict(), dict(id=id, code=code)
+        for __schema in self.get_flow(code=code):
+            for __field in __schema["schema"]:
+                columns[__field["name"]] = self.map_candles(values, columns, __field, query, trunc)
+        data = [dict(zip(columns.keys(), __row)) for __row in zip(*columns.values())]
+        data = self._set_update_time_by_interval(data, **context)
+        return filter_data(data, fields=fields, if_null="pass")
+
+    def map_candles(self, values: np.ndarray, columns: Dict[str,List], field: Dict, query: Dict, trunc=2) -> List:
+        key, dtype = field["path"][0], field["type"]
+        if field["mode"] == "QUERY": return [query.get(key)]*len(values)
+        elif key in columns:
+            return [(__value.date() if (dtype is dt.date) and (__value is not None) else __value) for __value in columns[key]]
+        elif key not in SQUARE_PRICE_FIELDS: return [None]*len(values)
+        __column = values[:,SQUARE_PRICE_FIELDS.index(key)]
+        if dtype is dt.datetime:
+            return pd.to_datetime(__column, unit="ms", utc=True).tz_convert(tzlocal()).tz_localize(None).to_pydatetime().tolist()
+        else: return cast_candles(__column, dtype, trunc)
+
+    def slice_candles(self, values: np.ndarray, startTime: Optional[int]=None, endTime: Optional[int]=None) -> np.ndarray:
+        values = values[~np.isnan(values[:,0])]
+        if (len(values) > 1) and (np.diff(values[:,0]) < 0).any():
+            values = values[np.argsort(values[:,0], kind="stable")]
+        start = np.searchsorted(values[:,0], startTime, side="left") if startTime is not None else 0
+        end = np.searchsorted(values[:,0], endTime, side="right") if endTime is not None else len(values)
+        return values[start:end]
 
     def get_flow(self, code=str(), **context) -> Flow:
-        is_kr_price = (not code) or re.match("\d{6}", str(code))
-        return super().get_flow(Flow("id", ("kr" if is_kr_price else "us")))
+        return super().get_flow(Flow("id", ("kr" if is_kr_code(code) else "us")))
 
     def get_upload_columns(self, name=str(), **context) -> IndexLabel:
         return KR_STOCK_PRICE_SCHEMA(self.dateType).get("name")
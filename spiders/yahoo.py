@@ -1,20 +1,32 @@
-from spiders import FinanceSpider, FinanceAsyncSpider, Flow, EST, get_headers
+from spiders import FinanceSpider, FinanceAsyncSpider, Flow, EST, KST, get_headers
 from spiders import GET, API, YAHOO, URL, Symbol
 
-from data.yahoo import YAHOO_TICKER_INFO, YAHOO_TICKER_SECTION
+from data.yahoo import YAHOO_TICKER_INFO, YAHOO_TICKER_SECTION, get_yahoo_modules, flatten_yahoo_summary
 from data.yahoo import YAHOO_QUERY_INFO, YAHOO_QUERY_FIELDS, YAHOO_SUMMARY_INFO
-from data.yahoo import get_yahoo_params, get_yahoo_cookies
+from data.yahoo import YAHOO_CRUMB, YAHOO_CREDENTIAL_TTL, get_yahoo_params, get_yahoo_cookies
 
 from data import US_STOCK_PRICE_SCHEMA
-from data.yahoo import YAHOO_PRICE_INFO, YAHOO_DATE_LIMIT
+from data.yahoo import YAHOO_PRICE_INFO, YAHOO_PRICE_COLUMNS, YAHOO_BAR_COLUMNS, YAHOO_DATE_LIMIT, YAHOO_WINDOW_LIMIT
+from base.store import BarStore, FETCH_COALESCER, merge_ranges
 
-from gscraper.base.types import IndexLabel, Keyword, DateFormat, Records, Data
-from gscraper.utils.map import inter, endswith
+from gscraper.base.types import IndexLabel, Keyword, DateFormat, Timezone, Records, Data
+from gscraper.base.spider import parse_cookies
+from gscraper.utils.map import inter, endswith, get_value
 
-from typing import Dict, Optional, Tuple, Union
+from typing import Awaitable, Callable, Dict, List, Optional, Tuple, Type, Union
 from abc import ABCMeta
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlparse
+import asyncio
+import aiohttp
+import functools
 import datetime as dt
+import numpy as np
 import pandas as pd
+import threading
+import time
+import weakref
 import yfinance
 
 
@@ -25,9 +37,168 @@ def fmt(symbol: str) -> str:
     else: return str()
 
 
-def get_yahoo_headers(url: str, symbol=str(), referer=str(), **kwargs) -> Dict[str,str]:
+cast_symbols = lambda symbol: symbol if isinstance(symbol, List) else [symbol]
+
+get_symbol_tzinfo = lambda symbol: KST if endswith(symbol, [".KS", ".KQ"]) else EST
+
+
+def cast_column(__s: pd.Series, type: Type) -> List:
+    if type is float: return pd.to_numeric(__s, errors="coerce").to_numpy(dtype=float).tolist()
+    elif type is int:
+        values = pd.to_numeric(__s, errors="coerce").to_numpy(dtype=float)
+        isna = np.isnan(values)
+        values = np.trunc(np.where(isna, 0, values)).astype(np.int64).astype(object)
+        values[isna] = None
+        return values.tolist()
+    else: return __s.where(__s.notna(), None).tolist()
+
+
+def validate_section(section: Keyword=["summary"], prepost=False) -> Keyword:
+    section = inter(YAHOO_TICKER_SECTION, section) if section else list(YAHOO_TICKER_SECTION)
+    if section[0] == "summary":
+        section.insert(1, ("prepost" if prepost else "regular"))
+    return section
+
+
+def get_yahoo_headers(url: str, symbol=str(), referer=str(), cookies: Optional[str]=None, **kwargs) -> Dict[str,str]:
     referer = referer if referer else URL(GET, YAHOO, "main", fmt(symbol))
-    return get_headers(url, referer=referer, origin=True, cookies=get_yahoo_cookies(), **kwargs)
+    cookies = cookies if cookies else get_yahoo_cookies()
+    return get_headers(url, referer=referer, origin=True, cookies=cookies, **kwargs)
+
+
+def is_unauthorized(response: Dict) -> bool:
+    if not isinstance(response, Dict): return False
+    for __root in ["finance", "quoteResponse", "quoteSummary"]:
+        error = get_value(response, [__root, "error"])
+        if isinstance(error, Dict) and ((str(error.get("code")).lower() == "unauthorized")
+                or ("crumb" in str(error.get("description")).lower())): return True
+    return False
+
+
+###################################################################
+######################### Yahoo Credential ########################
+###################################################################
+
+class YahooCredential(object):
+    __slots__ = ("ttl", "cookies", "crumb", "expires", "generation", "headers", "lock", "locks")
+
+    def __init__(self, ttl: float=YAHOO_CREDENTIAL_TTL):
+        self.ttl, self.lock, self.locks = ttl, threading.Lock(), weakref.WeakKeyDictionary()
+        self.cookies, self.crumb, self.expires, self.generation, self.headers = str(), str(), 0., 0, dict()
+
+    def is_valid(self) -> bool:
+        return bool(self.crumb) and (time.monotonic() < self.expires)
+
+    def update(self, cookies: str, crumb: str):
+        with self.lock:
+            self.cookies, self.crumb, self.headers = cookies, crumb, dict()
+            self.expires, self.generation = time.monotonic()+self.ttl, self.generation+1
+
+    def invalidate(self, generation: Optional[int]=None):
+        with self.lock:
+            if (generation is None) or (generation == self.generation): self.expires = 0.
+
+    def get_params(self, **kwargs) -> Dict:
+        return get_yahoo_params(crumb=self.crumb, **kwargs)
+
+    def get_headers(self, url: str) -> Dict[str,str]:
+        host = urlparse(url).hostname
+        with self.lock:
+            if host not in self.headers:
+                self.headers[host] = get_yahoo_headers(url, cookies=self.cookies)
+            return self.headers[host]
+
+    def get_async_lock(self) -> asyncio.Lock:
+        loop = asyncio.get_running_loop()
+        with self.lock:
+            if loop not in self.locks: self.locks[loop] = asyncio.Lock()
+            return self.locks[loop]
+
+    async def refresh(self, session: Optional[aiohttp.ClientSession]=None):
+        async with self.get_async_lock():
+            if self.is_valid(): return
+            if session is not None: return self.update(*(await self.fetch_credential(session)))
+            async with aiohttp.ClientSession() as session:
+                self.update(*(await self.fetch_credential(session)))
+
+    async def fetch_credential(self, session: aiohttp.ClientSession) -> Tuple[str,str]:
+        try:
+            async with session.get(URL(API, YAHOO, "cookie"), allow_redirects=True) as response:
+                await response.read()
+            cookies = parse_cookies(dict({__cookie.key: __cookie.value for __cookie in session.cookie_jar}))
+            cookies = '; '.join([__cookies for __cookies in [get_yahoo_cookies(), cookies] if __cookies])
+            url = URL(API, YAHOO, "crumb")
+            async with session.get(url, headers=get_yahoo_headers(url, cookies=cookies)) as response:
+                crumb = (await response.text()).strip() if response.status == 200 else str()
+            if crumb and ('<' not in crumb) and (' ' not in crumb): return cookies, crumb
+        except (aiohttp.ClientError, asyncio.TimeoutError): pass
+        return get_yahoo_cookies(), YAHOO_CRUMB
+
+
+YAHOO_CREDENTIAL = YahooCredential()
+
+
+###################################################################
+########################### Yahoo Hedge ###########################
+###################################################################
+
+YAHOO_HOSTS = {"query1.finance.yahoo.com": "query2.finance.yahoo.com", "query2.finance.yahoo.com": "query1.finance.yahoo.com"}
+
+
+def get_alternate_url(url: str) -> Optional[str]:
+    host = urlparse(url).hostname
+    return url.replace(host, YAHOO_HOSTS[host], 1) if host in YAHOO_HOSTS else None
+
+
+class YahooHedge(object):
+    __slots__ = ("quantile", "delay", "minDelay", "latencies", "requests", "hedges", "wins", "lock")
+
+    def __init__(self, quantile: float=0.95, delay: float=1., minDelay: float=0.05, window: int=200):
+        self.quantile, self.delay, self.minDelay = quantile, delay, minDelay
+        self.latencies, self.lock = deque(maxlen=window), threading.Lock()
+        self.requests, self.hedges, self.wins = 0, 0, 0
+
+    def get_delay(self) -> float:
+        with self.lock:
+            if len(self.latencies) < 10: return self.delay
+            return max(float(np.quantile(self.latencies, self.quantile)), self.minDelay)
+
+    def record(self, latency: float, hedged=False, won=False):
+        with self.lock:
+            self.latencies.append(latency)
+            self.requests, self.hedges, self.wins = self.requests+1, self.hedges+int(hedged), self.wins+int(won)
+
+    def get_metrics(self) -> Dict[str,float]:
+        with self.lock:
+            return dict(requests=self.requests, hedges=self.hedges, wins=self.wins,
+                        hedgeRate=(self.hedges/self.requests if self.requests else 0.),
+                        winRate=(self.wins/self.hedges if self.hedges else 0.))
+
+    async def request(self, request: Callable[[str],Awaitable], url: str, alternate: str):
+        start = time.monotonic()
+        primary = asyncio.ensure_future(request(url))
+        done, _ = await asyncio.wait({primary}, timeout=self.get_delay())
+        if done:
+            response = primary.result()
+            self.record(time.monotonic()-start)
+            return response
+        hedged = time.monotonic()
+        secondary = asyncio.ensure_future(request(alternate))
+        pending = {primary, secondary}
+        try:
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for __task in done:
+                    if __task.exception() is not None: continue
+                    won = (__task is secondary)
+                    self.record(time.monotonic()-(hedged if won else start), hedged=True, won=won)
+                    return __task.result()
+            return primary.result()
+        finally:
+            for __task in pending: __task.cancel()
+
+
+YAHOO_HEDGE = YahooHedge()
 
 
 class YahooSpider(FinanceSpider):
@@ -44,6 +215,23 @@ class YahooAsyncSpider(FinanceAsyncSpider):
     host = YAHOO
     where = "Yahoo Finance"
     tzinfo = EST
+    credential = YAHOO_CREDENTIAL
+    hedger = YAHOO_HEDGE
+    hedge = False
+
+    async def request_yahoo(self, url: str, params: Dict=dict(), session: Optional[aiohttp.ClientSession]=None,
+                            hedge: Optional[bool]=None, **context) -> Dict:
+        hedge = self.hedge if hedge is None else hedge
+        for __retry in range(2):
+            if not self.credential.is_valid(): await self.credential.refresh(session)
+            generation, __params = self.credential.generation, self.credential.get_params(**params)
+            request = lambda __url: self.request_json(GET, __url, params=__params, encode=True,
+                                    headers=self.credential.get_headers(__url), session=session, **context)
+            alternate = get_alternate_url(url) if hedge else None
+            response = await (self.hedger.request(request, url, alternate) if alternate else request(url))
+            if not is_unauthorized(response): return response
+            self.credential.invalidate(generation)
+        return response
 
 
 ###################################################################
@@ -72,13 +260,34 @@ class YahooTickerSpider(YahooSpider):
         return self.parse(response.info, symbol=symbol, section=section, prepost=prepost, **context)
 
     def get_flow(self, section: Keyword=["summary"], prepost=False, **context) -> Flow:
-        return super().get_flow(Flow(*self.validate_section(section, prepost)))
+        return super().get_flow(Flow(*validate_section(section, prepost)))
 
-    def validate_section(self, section: Keyword=["summary"], prepost=False) -> Keyword:
-        section = inter(YAHOO_TICKER_SECTION, section) if section else YAHOO_TICKER_SECTION
-        if section[0] == "summary":
-            section.insert(1, ("prepost" if prepost else "regular"))
-        return section
+
+class YahooTickerAsyncSpider(YahooAsyncSpider):
+    operation = "yahooTicker"
+    which = "stock information"
+    iterateArgs = ["symbol"]
+    iterateUnit = 1
+    responseType = "dict"
+    returnType = "records"
+    info = YAHOO_TICKER_INFO()
+    flow = Flow()
+
+    @YahooAsyncSpider.init_session
+    async def crawl(self, symbol: Symbol, section: Keyword=["summary"], prepost=False, trunc: Optional[int]=2, **context) -> Data:
+        args, context = self.validate_params(locals())
+        return await self.gather(*args, **context)
+
+    @YahooAsyncSpider.retry_request
+    @YahooAsyncSpider.limit_request
+    async def fetch(self, symbol: str, section: Keyword=["summary"], prepost=False, **context) -> Dict:
+        url = URL(API, YAHOO, "summary", fmt(symbol))
+        modules = get_yahoo_modules(validate_section(section, prepost))
+        response = await self.request_yahoo(url, params=dict(modules=','.join(modules), formatted="false"), **context)
+        return self.parse(flatten_yahoo_summary(response, modules), symbol=symbol, section=section, prepost=prepost, **context)
+
+    def get_flow(self, section: Keyword=["summary"], prepost=False, **context) -> Flow:
+        return super().get_flow(Flow(*validate_section(section, prepost)))
 
 
 ###################################################################
@@ -98,12 +307,18 @@ class YahooQuerySpider(YahooAsyncSpider):
 
     @YahooAsyncSpider.retry_request
     @YahooAsyncSpider.limit_request
-    async def fetch(self, symbol: str, **context) -> Dict:
-        url = URL(API, YAHOO, "query", fmt(symbol))
-        params = get_yahoo_params(symbols=fmt(symbol), fields=','.join(YAHOO_QUERY_FIELDS))
-        headers = get_yahoo_headers(url, symbol)
-        response = await self.request_json(GET, url, params=params, encode=True, headers=headers, **context)
-        return self.parse(response, symbol=symbol, **context)
+    async def fetch(self, symbol: Union[str,List[str]], **context) -> Union[Dict,Records]:
+        url = URL(API, YAHOO, "query")
+        symbols = ','.join([fmt(__symbol) for __symbol in cast_symbols(symbol)])
+        response = await self.request_yahoo(url, params=dict(symbols=symbols, fields=','.join(YAHOO_QUERY_FIELDS)), **context)
+        if isinstance(symbol, List): return self.parse_batch(response, symbol=symbol, **context)
+        else: return self.parse(response, symbol=symbol, **context)
+
+    def parse_batch(self, response: Dict, symbol: List[str], **context) -> Records:
+        results = get_value(response, ["quoteResponse","result"], default=list()) or list()
+        results = {str(__result.get("symbol")).upper(): __result for __result in results if isinstance(__result, Dict)}
+        return [self.parse({"quoteResponse":{"result":([results[__key]] if __key in results else list())}}, symbol=__symbol, **context)
+                for __symbol, __key in zip(symbol, [fmt(__symbol).upper() for __symbol in symbol])]
 
 
 class YahooSummarySpider(YahooAsyncSpider):
@@ -121,9 +336,7 @@ class YahooSummarySpider(YahooAsyncSpider):
     @YahooAsyncSpider.limit_request
     async def fetch(self, symbol: str, **context) -> Dict:
         url = URL(API, YAHOO, "summary", fmt(symbol))
-        params = get_yahoo_params(modules="assetProfile,secFilings")
-        headers = get_yahoo_headers(url, symbol)
-        response = await self.request_json(GET, url, params=params, encode=True, headers=headers, **context)
+        response = await self.request_yahoo(url, params=dict(modules="assetProfile,secFilings"), **context)
         return self.parse(response, symbol=symbol, **context)
 
 
@@ -138,6 +351,9 @@ class YahooPriceSpider(YahooSpider):
     iterateUnit = 1
     responseType = "records"
     returnType = "records"
+    numWindows = 4
+    storeFormat = ".parquet"
+    coalescer = FETCH_COALESCER
     info = YAHOO_PRICE_INFO()
     flow = Flow("price")
 
@@ -145,36 +361,144 @@ class YahooPriceSpider(YahooSpider):
     def crawl(self, symbol: Symbol, startDate: Optional[DateFormat]=None, endDate: Optional[DateFormat]=None,
             period: Optional[str]=None, freq: Union[str,int]="1d", prepost=False, trunc: Optional[int]=2, **context) -> Data:
         if period is None:
-            startDate, endDate, interval = self.set_date(startDate, endDate, freq)
+            startDate, endDate = self.set_date(startDate, endDate, freq=freq)
         args, context = self.validate_params(locals())
         return self.gather(*args, **context)
 
     def set_date(self, startDate: Optional[DateFormat]=None, endDate: Optional[DateFormat]=None,
-                period: Optional[str]=None, freq: Union[str,int]="1d") -> Tuple[dt.date,dt.date,str]:
+                freq: Union[str,int]="1d") -> Tuple[dt.date,dt.date]:
         startDate, endDate = self.get_date_pair(startDate, endDate)
-        today, limit = self.today(), YAHOO_DATE_LIMIT[freq]
-        hasEnd, endDate = bool(endDate), (endDate if endDate else today)
-        if freq != "1m": return startDate, endDate, str()
-        elif not startDate: return (endDate-dt.timedelta(limit-1)), endDate, "7D"
-        elif (today-startDate).days < limit: return startDate, endDate, "7D"
-        elif hasEnd: return (endDate-dt.timedelta(limit-1)), endDate, "7D"
-        else: return startDate, (startDate+dt.timedelta(limit-1)), "7D"
+        today, limit = self.today(), YAHOO_DATE_LIMIT.get(freq)
+        endDate = endDate if endDate else today
+        if not limit: return startDate, endDate
+        firstDate = today-dt.timedelta(limit-1)
+        return (max(startDate, firstDate) if startDate else firstDate), endDate
+
+    def get_windows(self, startDate: Optional[dt.date]=None, endDate: Optional[dt.date]=None,
+                    freq: Union[str,int]="1d") -> List[Tuple[dt.date,dt.date]]:
+        window = YAHOO_WINDOW_LIMIT.get(freq)
+        if not (window and isinstance(startDate, dt.date) and isinstance(endDate, dt.date)): return [(startDate, endDate)]
+        starts = [startDate+dt.timedelta(__days) for __days in range(0, max((endDate-startDate).days, 1), window)]
+        return [(__start, min(__start+dt.timedelta(window), endDate)) for __start in starts]
 
     @YahooSpider.retry_request
     @YahooSpider.limit_request
-    def fetch(self, symbol: str, startDate: Optional[dt.date]=None, endDate: Optional[dt.date]=None,
-            period: Optional[str]=None, freq: Union[str,int]="1d", prepost=False, **context) -> Records:
-        response = yfinance.download(fmt(symbol), startDate, endDate, period=period, interval=freq, prepost=prepost, progress=False)
+    def fetch(self, symbol: Union[str,List[str]], startDate: Optional[dt.date]=None, endDate: Optional[dt.date]=None,
+            period: Optional[str]=None, freq: Union[str,int]="1d", prepost=False, storePath: Optional[str]=None, **context) -> Records:
+        if storePath and (period is None) and startDate and endDate:
+            store = self.get_store(storePath, freq, prepost)
+            ranges = merge_ranges([__range for __symbol in cast_symbols(symbol) for __range in
+                store.get_gaps(__symbol, startDate, endDate, tzinfo=get_symbol_tzinfo(__symbol), today=self.today())])
+            response = self.download(symbol, ranges, freq=freq, prepost=prepost)
+            response = self.update_store(store, response, symbol, startDate, endDate, ranges)
+        else: response = self.download(symbol, [(startDate, endDate)], period=period, freq=freq, prepost=prepost)
         return self.parse(response, symbol=symbol, **context)
 
+    def download(self, symbol: Union[str,List[str]], ranges: List[Tuple[dt.date,dt.date]], period: Optional[str]=None,
+                freq: Union[str,int]="1d", prepost=False) -> pd.DataFrame:
+        if self.coalescer is None: return self.download_windows(symbol, ranges, period, freq, prepost)
+        elif (period is None) and ranges and all(isinstance(__date, dt.date) for __range in ranges for __date in __range):
+            key = (self.__class__.__name__, tuple(cast_symbols(symbol)), isinstance(symbol, List), freq, prepost)
+            fetch = lambda __ranges: self.download_windows(symbol, __ranges, period, freq, prepost)
+            return self.coalescer.get_range(key, ranges, fetch, merge=self.concat_windows, take=self.slice_ranges)
+        key = (self.__class__.__name__, tuple(cast_symbols(symbol)), isinstance(symbol, List), tuple(ranges), period, freq, prepost)
+        return self.coalescer.get(key, lambda: self.download_windows(symbol, ranges, period, freq, prepost)).copy()
+
+    def download_windows(self, symbol: Union[str,List[str]], ranges: List[Tuple[dt.date,dt.date]], period: Optional[str]=None,
+                        freq: Union[str,int]="1d", prepost=False) -> pd.DataFrame:
+        tickers, batch = ([fmt(__symbol) for __symbol in symbol], dict(group_by="ticker")) if isinstance(symbol, List) else (fmt(symbol), dict())
+        download = functools.partial(yfinance.download, tickers, period=period, interval=freq, prepost=prepost, progress=False, **batch)
+        windows = [__window for __range in ranges for __window in self.get_windows(*__range, freq)] if period is None else [(None, None)]
+        if not windows: return pd.DataFrame()
+        elif len(windows) == 1: return download(*windows[0])
+        with ThreadPoolExecutor(max_workers=min(len(windows), self.numWindows)) as executor:
+            return self.concat_windows(list(executor.map(lambda __window: download(*__window), windows)))
+
+    def concat_windows(self, responses: List[pd.DataFrame]) -> pd.DataFrame:
+        responses = [__response for __response in responses if not __response.empty]
+        if not responses: return pd.DataFrame()
+        response = pd.concat(responses).sort_index(kind="stable")
+        return response[~response.index.duplicated(keep="last")]
+
+    def slice_ranges(self, response: pd.DataFrame, ranges: List[Tuple[dt.date,dt.date]]) -> pd.DataFrame:
+        if not isinstance(response.index, pd.DatetimeIndex): return response.copy()
+        dates = (response.index.tz_localize(None) if response.index.tz else response.index).normalize()
+        within = np.zeros(len(response), dtype=bool)
+        for __start, __end in ranges:
+            within |= (dates >= pd.Timestamp(__start)) & (dates < pd.Timestamp(__end))
+        return response[within].copy()
+
     @YahooSpider.validate_response
-    def parse(self, response: pd.DataFrame, **context) -> Records:
-        return self.map(response[::-1].reset_index().to_dict("records"), **context)[::-1]
+    def parse(self, response: pd.DataFrame, symbol: Union[str,List[str]], **context) -> Records:
+        if isinstance(symbol, List):
+            return [__m for __symbol in symbol for __m in self.map_response(response, symbol=__symbol, **context)]
+        else: return self.map_response(response, symbol=symbol, **context)
+
+    def map_response(self, response: pd.DataFrame, symbol: str, fields: IndexLabel=list(), **context) -> Records:
+        response = self.split_response(response, symbol)
+        if response.empty: return list()
+        data = dict(self.map_columns(response, symbol=symbol, **context), **self._set_update_time_by_interval(dict(), **context))
+        keys = list(fields) if fields else list(data.keys())
+        values = [(data[__key] if isinstance(data.get(__key), List) else [data.get(__key)]*len(response)) for __key in keys]
+        return [dict(zip(keys, __row)) for __row in zip(*values)]
+
+    def map_columns(self, response: pd.DataFrame, symbol: str, tzinfo: Optional[Timezone]=None, **context) -> Dict[str,Union[List,str]]:
+        data = dict()
+        for field in self.info["price"]:
+            if field["mode"] == "QUERY": __value = symbol
+            elif field["name"] in YAHOO_PRICE_COLUMNS: __value = YAHOO_PRICE_COLUMNS[field["name"]](response, tzinfo=tzinfo)
+            elif field["path"][0] in response: __value = cast_column(response[field["path"][0]], field["type"])
+            else: __value = None
+            if (__value is not None) or (field["mode"] != "OPTIONAL"): data[field["name"]] = __value
+        return data
+
+    def split_response(self, response: pd.DataFrame, symbol: str) -> pd.DataFrame:
+        if not isinstance(response.columns, pd.MultiIndex): return response
+        for level in range(response.columns.nlevels):
+            if fmt(symbol) in response.columns.get_level_values(level):
+                return response.xs(fmt(symbol), axis=1, level=level).dropna(how="all")
+        return pd.DataFrame()
 
     def is_valid_response(self, response: pd.DataFrame) -> bool:
         if response.empty: raise ValueError("Failed download")
         else: return True
 
+    ###################################################################
+    ############################ Bar Store ############################
+    ###################################################################
+
+    def get_store(self, storePath: str, freq: Union[str,int]="1d", prepost=False) -> BarStore:
+        dateType = "datetime" if YAHOO_DATE_LIMIT.get(freq) else "date"
+        interval = f"{freq}-prepost" if prepost and (dateType == "datetime") else str(freq)
+        columns = US_STOCK_PRICE_SCHEMA(dateType).get("name")
+        columns = columns + [__name for __name in YAHOO_BAR_COLUMNS.values() if __name not in columns]
+        return BarStore(storePath, interval=interval, dateType=dateType, columns=columns, format=self.storeFormat)
+
+    def update_store(self, store: BarStore, response: pd.DataFrame, symbol: Union[str,List[str]],
+                    startDate: dt.date, endDate: dt.date, ranges: List[Tuple[dt.date,dt.date]]=list()) -> pd.DataFrame:
+        if not response.empty:
+            data = {__symbol: self.to_store(store, self.split_response(response, __symbol), __symbol) for __symbol in cast_symbols(symbol)}
+            store.write(pd.concat(data.values(), ignore_index=True))
+            for __symbol, __data in data.items():
+                if len(__data): store.mark_empty(__symbol, ranges, tzinfo=get_symbol_tzinfo(__symbol), today=self.today())
+        if isinstance(symbol, List):
+            data = {fmt(__symbol): self.from_store(store, store.read(__symbol, startDate, endDate)) for __symbol in symbol}
+            return pd.concat(data, axis=1, names=["Ticker","Price"]) if data else pd.DataFrame()
+        else: return self.from_store(store, store.read(symbol, startDate, endDate))
+
+    def to_store(self, store: BarStore, response: pd.DataFrame, symbol: str) -> pd.DataFrame:
+        if response.empty: return pd.DataFrame(columns=store.columns)
+        data = pd.DataFrame({__name: response[__column].to_numpy() for __column, __name in YAHOO_BAR_COLUMNS.items() if __column in response})
+        data["symbol"] = symbol
+        data[store.dateType] = YAHOO_PRICE_COLUMNS[store.dateType](response)
+        return data.reindex(columns=store.columns)
+
+    def from_store(self, store: BarStore, data: pd.DataFrame) -> pd.DataFrame:
+        index = pd.DatetimeIndex(pd.to_datetime(data[store.dateType]), name=store.dateType.capitalize())
+        data = data.drop(columns=["symbol", store.dateType]).rename(columns={__name: __column for __column, __name in YAHOO_BAR_COLUMNS.items()})
+        if ("Adj Close" in data) and data["Adj Close"].isna().all(): data = data.drop(columns=["Adj Close"])
+        return data.set_axis(index, axis=0).astype(float)
+
     def get_upload_columns(self, interval="1d", name=str(), **context) -> IndexLabel:
         if name == "sheet":
             dateType = "datetime" if YAHOO_DATE_LIMIT.get(interval) else "date"
@@ -0,0 +1,16 @@
+from pipelines.yahoo import DailyNasdaqPipeline, TaskErrors
+
+import pandas as pd
+import pytest
+
+
+def test_gather_tasks_raises_all_failures(monkeypatch):
+    def run_task(self, task, symbol=list(), **context):
+        if task["dataName"] in ("^VIX", "^TNX"): raise ValueError(task["dataName"])
+        return pd.DataFrame(columns=list(task["fields"]))
+    monkeypatch.setattr(DailyNasdaqPipeline, "run_task", run_task)
+    pipeline = DailyNasdaqPipeline()
+    with pytest.raises(TaskErrors) as info:
+        pipeline.gather_tasks()
+    assert {__name: str(__error) for __name, __error in info.value.errors.items()} == {"^VIX":"^VIX", "^TNX":"^TNX"}
+    assert [__error["dataName"] for __error in pipeline.errors] == ["^VIX", "^TNX"]
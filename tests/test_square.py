@@ -0,0 +1,82 @@
+from pipelines.square import StockPriceKrPipeline, get_session_bars
+from spiders.square import SquarePriceSpider
+from base.spider import KST, busday_range
+
+from dateutil.tz import tzlocal
+import asyncio
+import datetime as dt
+import numpy as np
+import pandas as pd
+import pytest
+
+
+def price_records(id: str, code: str, freq=1, limit=600):
+    perDay = get_session_bars(freq)
+    days = pd.bdate_range(end="2026-10-16", periods=-(-limit//perDay))
+    offsets = pd.to_timedelta(np.tile(np.arange(perDay)*freq, len(days)), unit="m") + pd.Timedelta(hours=9)
+    times = (days.repeat(perDay) + offsets)[-limit:].tz_localize("Asia/Seoul").tz_convert(tzlocal()).tz_localize(None)
+    return [dict(id=id, code=code, datetime=__time, date=__time.date(), open=100, high=110, low=90, close=105, volume=10)
+            for __time in times.to_pydatetime()]
+
+
+@pytest.fixture
+def calls(monkeypatch):
+    calls = list()
+    async def crawl(self, id, code=list(), freq="day", limit=600, **context):
+        calls.append(dict(code=list(code), freq=freq, limit=limit))
+        return [__m for __id, __code in zip(id, code) for __m in price_records(__id, __code, freq, limit)]
+    monkeypatch.setattr(SquarePriceSpider, "crawl", crawl)
+    return calls
+
+
+@pytest.mark.parametrize("freq, source", [(1, "stock_1m"), (60, "stock_1h")])
+def test_resample_covers_limit_bars(calls, freq, source):
+    query = [dict(id="A", code="005930", freq=freq), dict(id="B", code="000660", freq=freq)]
+    data = asyncio.run(StockPriceKrPipeline().crawl(query=query, limit=600, resample=True))
+    assert calls == [dict(code=["005930","000660"], freq=freq, limit=600*get_session_bars(freq))]
+    for __type in ["stock_1d", "stock_1h", "stock_1m"][:(3 if freq == 1 else 2)]:
+        assert pd.DataFrame(data[__type]).groupby("code").size().to_dict() == {"000660":600, "005930":600}, __type
+
+
+###################################################################
+######################## Alpha Square Pages #######################
+###################################################################
+
+def candle_feed(open="09:00:00", minutes=390, halfDays=list()):
+    days = pd.to_datetime(busday_range(dt.date(2026,1,1), dt.date(2026,10,16), KST))
+    times = [__time for __day in days for __time in pd.date_range(__day+pd.Timedelta(open), periods=(
+                minutes//2 if __day.date().isoformat() in halfDays else minutes), freq="min")]
+    return (pd.DatetimeIndex(times).tz_localize("Asia/Seoul").asi8 // 10**6)
+
+
+@pytest.fixture
+def requests(monkeypatch):
+    requests = dict(feed=candle_feed(), params=list())
+    async def request_json(self, method, url, params=dict(), **context):
+        requests["params"].append(dict(params))
+        feed = requests["feed"]
+        if "before" in params: feed = feed[feed < params["before"]]
+        return {"data": [[int(__ts), 1, 2, .5, 1.5, 10] for __ts in feed[-params["limit"]:]]}
+    monkeypatch.setattr(SquarePriceSpider, "request_json", request_json)
+    return requests
+
+
+def crawl_minutes(**params) -> pd.DataFrame:
+    return pd.DataFrame(asyncio.run(SquarePriceSpider(progress=False).crawl(id="A", code="005930", freq=1, **params)))
+
+
+def test_pages_cover_extended_hours(requests):
+    requests["feed"] = candle_feed(open="08:00:00", minutes=600)
+    data = crawl_minutes(startTime="2026-10-12 08:00+09:00", endTime="2026-10-16 18:00+09:00")
+    assert len(data) == 3000 and data["datetime"].is_unique
+
+
+def test_pages_cover_limit_on_half_days(requests):
+    requests["feed"] = candle_feed(halfDays=["2026-10-14", "2026-10-15"])
+    data = crawl_minutes(limit=2000)
+    assert len(data) == 2000 and data["datetime"].is_unique
+
+
+def test_cursored_pages_without_gaps_need_no_fill(requests):
+    data = crawl_minutes(startTime="2026-10-12 09:00+09:00", endTime="2026-10-16 15:30+09:00")
+    assert len(data) == 1950 and (len(requests["params"]) == 3)
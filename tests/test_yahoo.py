@@ -0,0 +1,98 @@
+from spiders.yahoo import YahooPriceSpider, YahooQuerySpider
+from base.store import FetchCoalescer, subtract_ranges
+from data.yahoo import YAHOO_PRICE_COLUMNS
+
+from concurrent.futures import ThreadPoolExecutor
+import datetime as dt
+import time
+import pandas as pd
+
+
+def price_frame(ranges) -> pd.DataFrame:
+    dates = [__date for __start, __end in ranges for __date in pd.bdate_range(__start, __end-dt.timedelta(days=1))]
+    index = pd.DatetimeIndex(dates, name="Date")
+    return pd.DataFrame({"Open":1., "High":2., "Low":.5, "Close":1.5, "Volume":100.}, index=index)
+
+
+class StubPriceSpider(YahooPriceSpider):
+    def __init__(self, coalescer: FetchCoalescer, calls: list, delay=0., **kwargs):
+        super().__init__(progress=False, **kwargs)
+        self.coalescer, self.calls, self.delay = coalescer, calls, delay
+
+    def download_windows(self, symbol, ranges, period=None, freq="1d", prepost=False) -> pd.DataFrame:
+        self.calls.append(list(ranges))
+        time.sleep(self.delay)
+        return price_frame(ranges)
+
+
+###################################################################
+########################## Fetch Coalescer ########################
+###################################################################
+
+def test_subtract_ranges():
+    covered = [(dt.date(2026,1,5), dt.date(2026,1,10))]
+    assert subtract_ranges([(dt.date(2026,1,1), dt.date(2026,1,20))], covered) == \
+        [(dt.date(2026,1,1), dt.date(2026,1,5)), (dt.date(2026,1,10), dt.date(2026,1,20))]
+    assert subtract_ranges([(dt.date(2026,1,6), dt.date(2026,1,8))], covered) == list()
+
+
+def test_overlapping_ranges_share_one_download():
+    coalescer, calls = FetchCoalescer(), list()
+    outer = [(dt.date(2026,1,1), dt.date(2026,2,1))]
+    inner = [(dt.date(2026,1,10), dt.date(2026,1,20))]
+    spider = StubPriceSpider(coalescer, calls, delay=.2)
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        first = executor.submit(spider.download, "^IXIC", outer)
+        while not coalescer.get_metrics()["inflight"]: time.sleep(.01)
+        second = executor.submit(StubPriceSpider(coalescer, calls).download, "^IXIC", inner)
+        first, second = first.result(), second.result()
+    assert calls == [outer]
+    pd.testing.assert_frame_equal(first, price_frame(outer))
+    pd.testing.assert_frame_equal(second, price_frame(inner))
+
+
+def test_partial_overlap_downloads_only_missing_range():
+    coalescer, calls = FetchCoalescer(), list()
+    spider = StubPriceSpider(coalescer, calls)
+    spider.download("^IXIC", [(dt.date(2026,1,6), dt.date(2026,2,1))])
+    lookback = [(dt.date(2026,1,1), dt.date(2026,2,1))]
+    data = spider.download("^IXIC", lookback)
+    assert calls[1:] == [[(dt.date(2026,1,1), dt.date(2026,1,6))]]
+    pd.testing.assert_frame_equal(data, price_frame(lookback))
+    spider.download("^IXIC", [(dt.date(2026,1,2), dt.date(2026,1,30))])
+    assert len(calls) == 2
+
+
+###################################################################
+########################## Price Columns ##########################
+###################################################################
+
+def hourly_frame() -> pd.DataFrame:
+    index = pd.date_range("2026-10-16 09:30", periods=3, freq="1h", tz="America/New_York", name="Datetime")
+    return pd.DataFrame({"Open":1., "High":2., "Low":.5, "Close":1.5, "Volume":100.}, index=index)
+
+
+def test_datetime_column_keeps_tzinfo():
+    data = YAHOO_PRICE_COLUMNS["datetime"](hourly_frame(), tzinfo="Asia/Seoul")
+    assert [str(__time) for __time in data] == \
+        ["2026-10-16 22:30:00+09:00", "2026-10-16 23:30:00+09:00", "2026-10-17 00:30:00+09:00"]
+    data = YahooPriceSpider(progress=False).map_columns(hourly_frame(), "AAPL", tzinfo="Asia/Seoul")
+    assert (data["datetime"][0].tzinfo is not None) and (data["date"][0] == dt.date(2026,10,16))
+
+
+def test_datetime_column_drops_tzinfo_by_default():
+    data = YAHOO_PRICE_COLUMNS["datetime"](hourly_frame())
+    assert data == [pd.Timestamp("2026-10-16 09:30"), pd.Timestamp("2026-10-16 10:30"), pd.Timestamp("2026-10-16 11:30")]
+
+
+###################################################################
+########################### Yahoo Query ###########################
+###################################################################
+
+def test_batch_query_keeps_missing_symbols():
+    spider = YahooQuerySpider(progress=False)
+    result = [{"symbol":"AAPL", "longName":"Apple Inc.", "fullExchangeName":"NasdaqGS"}]
+    data = spider.parse_batch({"quoteResponse":{"result":result}}, symbol=["AAPL", "ZZZZ"])
+    assert data == [spider.parse({"quoteResponse":{"result":result}}, symbol="AAPL"),
+                    spider.parse({"quoteResponse":{"result":list()}}, symbol="ZZZZ")]
+    assert (data[0]["name"] == "Apple Inc.") and ("updateDate" in data[1])